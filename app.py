@@ -1,405 +1,457 @@
 import streamlit as st
 import pandas as pd
+import json
+import time
+import uuid
 from io import BytesIO
-import re
-import chardet
+
+from load_combinations import DEFAULT_COMBINATIONS, check_factor_table, combine_loads, envelope
+from pipeline_stats import peak_rss_mb
+from project_workbook import pier_name, project_summary, unique_names, write_project_workbook
+from rcpier_parser import CATEGORIES, to_long
+from table_export import TABLE_FORMATS, write_table
+from upload_jobs import JobManager
 
 st.set_page_config(page_title="Text to Excel Converter", page_icon="📊", layout="wide")
 
 st.title("📊 RCPier Report to Excel Converter")
 st.markdown("Upload a text file containing RCPier load case data and convert it to an Excel file with organized sheets.")
 
-# File upload
-uploaded_file = st.file_uploader("Choose a text file", type=['txt'])
+# Encodings offered besides auto-detection
+ENCODING_CHOICES = ["Auto-detect", "ascii", "utf-8", "cp1252", "latin-1", "utf-16"]
 
-if uploaded_file is not None:
-    # Read the file content
-    file_bytes = uploaded_file.read()
-    
-    # Detect encoding
-    result = chardet.detect(file_bytes)
-    encoding = result['encoding']
-    
-    # Decode the file content
-    try:
-        textog = file_bytes.decode(encoding)
-    except:
-        # Fallback to utf-8 if detected encoding fails
-        textog = file_bytes.decode('utf-8', errors='ignore')
+# Seconds between two status checks of a running job
+POLL_INTERVAL = 0.5
+
+# Download types of the long (tidy) load table
+TABLE_MIME_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "feather": "application/vnd.apache.arrow.file",
+    "csv": "text/csv",
+}
+
+# Page sizes of the data preview; only one page is sent to the browser
+PREVIEW_CASES_PER_PAGE = [10, 25, 50, 100]
+PREVIEW_ROWS_PER_PAGE = [50, 200, 1000]
+
+
+@st.cache_resource
+def get_job_manager():
+    """Worker pool and job store shared by every session of this server"""
+    return JobManager()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_case_summary(file_hash, _df_dict):
+    """Rows and min/max/sum of the loads of every load case of an upload"""
+    return _df_dict.summary()
+
+
+@st.cache_data(show_spinner="Building long table...", max_entries=8)
+def build_table(file_hash, encoding_choice, fmt, _df_dict):
+    """Write the long (tidy) load table of an upload in fmt once per upload"""
+    output = BytesIO()
+    write_table(output, to_long(_df_dict), fmt)
+    return output.getvalue()
+
+
+@st.cache_data(show_spinner="Combining loads...", max_entries=8)
+def build_combinations(file_hash, encoding_choice, factors_json, _df_dict):
+    """Load combinations and their envelope for an upload and a factor table"""
+    results = combine_loads(_df_dict, json.loads(factors_json))
+    return results, envelope(results)
+
+
+def show_combinations(file_hash, encoding_choice, df_dict, file_name):
+    """Collapsible panel with the factored load combinations of the upload"""
+    with st.expander("🧮 Load combinations"):
+        st.write("Factors per combination and category; a [max, min] pair applies whichever governs. "
+                 "DC cases are summed, the cases of every other category are enveloped.")
+        factors_json = st.text_area("Factor table (JSON)", json.dumps(DEFAULT_COMBINATIONS, indent=2),
+                                    height=200)
+        try:
+            factors = check_factor_table(json.loads(factors_json))
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError too
+            st.error(f"❌ Invalid factor table: {e}")
+            return
+        
+        results, governing = build_combinations(file_hash, encoding_choice,
+                                                json.dumps(factors, sort_keys=True), df_dict)
+        st.write("**Envelope over all combinations:**")
+        st.dataframe(governing, hide_index=True, use_container_width=True)
+        st.write("**All combinations:**")
+        st.dataframe(results, hide_index=True, use_container_width=True)
+        st.download_button(
+            label="📥 Download Envelope (csv)",
+            data=governing.to_csv(index=False),
+            file_name=file_name.replace(".txt", "_envelope.csv"),
+            mime="text/csv"
+        )
+
+
+def show_performance(stats, export_seconds):
+    """Collapsible panel with the stage timings and rates of the conversion"""
+    with st.expander("⏱️ Performance"):
+        stages = dict(stats.stages)
+        if export_seconds is not None:
+            stages["export"] = export_seconds
+        total = sum(stages.values())
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total time", f"{total:.2f} s")
+        with col2:
+            st.metric("Throughput", f"{stats.bytes / 1e6 / total:.2f} MB/s" if total > 0 else "-")
+        with col3:
+            st.metric("Load cases/s", f"{stats.load_cases / total:,.0f}" if total > 0 else "-")
+        with col4:
+            st.metric("Rows/s", f"{stats.rows / total:,.0f}" if total > 0 else "-")
+        
+        st.dataframe(pd.DataFrame({
+            "Stage": list(stages),
+            "Seconds": [round(seconds, 4) for seconds in stages.values()],
+            "Share": [f"{seconds / total:.1%}" if total > 0 else "-" for seconds in stages.values()],
+        }), hide_index=True, use_container_width=True)
+        
+        st.write(f"**Input:** {stats.bytes / 1e6:.2f} MB, {stats.load_cases} load cases, {stats.rows} rows")
+        peak_rss = peak_rss_mb()
+        if peak_rss is not None:
+            st.write(f"**Peak process memory:** {peak_rss:.1f} MB")
+        st.write("**Counters:**")
+        st.json(stats.counters)
+
+
+def show_recent_jobs(manager):
+    """Sidebar list of the jobs of this session, with their downloads"""
+    with st.sidebar:
+        st.subheader("🗂️ Recent conversions")
+        # Jobs are shared between sessions; only list the ones submitted here
+        session_jobs = set(st.session_state.get("job_ids", ()))
+        jobs = [job for job in manager.list() if job.job_id in session_jobs]
+        if not jobs:
+            st.caption("No conversions yet.")
+        for job in jobs:
+            st.write(f"**{job.name}** · {job.size / 1e6:.2f} MB · {job.status} ({job.elapsed:.1f} s)")
+            if job.status == "done" and job.result()["workbook"] is not None:
+                st.download_button(
+                    label="📥 Excel",
+                    data=job.result()["workbook"],
+                    file_name=job.name.replace(".txt", ".xlsx"),
+                    mime="application/vnd.openpyxl-officedocument.spreadsheetml.sheet",
+                    key=f"job-{job.job_id}"
+                )
+            elif job.status == "failed":
+                st.caption(f"❌ {job.error}")
+
+
+def session_id():
+    """Random ID of this browser session, the owner of its jobs"""
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex
+    return st.session_state["session_id"]
+
+
+def submit_upload(manager, uploaded, encoding_choice):
+    """Job ID of an uploaded file; its bytes are hashed once per session"""
+    key = f"job-{uploaded.file_id}-{encoding_choice}"
+    job_id = st.session_state.get(key)
+    if job_id is None or manager.get(job_id) is None:
+        job_id = manager.submit(uploaded.getvalue(), encoding_choice, name=uploaded.name,
+                                owner=session_id())
+        st.session_state[key] = job_id
+    session_jobs = st.session_state.setdefault("job_ids", [])
+    if job_id not in session_jobs:
+        session_jobs.append(job_id)
+    return job_id
+
+
+def job_status(name, job):
+    """One line on the state of a pending job, with its parse progress"""
+    fraction, load_cases = job.progress
+    # The pool marks a job running while it waits in the call queue
+    if job.status == "queued" or not load_cases:
+        return f"**{name}**: waiting for a worker"
+    if fraction >= 1.0:
+        return f"**{name}**: parsed {load_cases} load cases, writing workbook..."
+    return f"**{name}**: parsing, {fraction:.0%} of report ({load_cases} load cases)"
+
+
+@st.cache_data(show_spinner="Building project workbook...", max_entries=4)
+def build_project_workbook(job_ids, _reports):
+    """Merged workbook of several converted reports, once per set of jobs"""
+    output = BytesIO()
+    write_project_workbook(output, _reports)
+    return output.getvalue()
+
+
+def show_project(jobs):
+    """Pier summary and the merged project workbook of several reports"""
+    piers = unique_names([pier_name(name) for name in jobs])
+    reports = {pier: job.result()["df_dict"] for pier, job in zip(piers, jobs.values())}
     
-    # Normalize line endings to Unix to make pattern matching robust
-    textog = textog.replace('\r\n', '\n').replace('\r', '\n')
+    st.subheader("🌉 Project")
+    summary = project_summary(reports)
+    summary["Seconds"] = [round(job.elapsed, 2) for job in jobs.values()]
+    st.dataframe(summary, hide_index=True, use_container_width=True)
     
-    # Process the text
-    # Remove everything after "Selected load groups"
-    if "Selected load groups" in textog:
-        textog = textog[:textog.find("Selected load groups")]
+    if any(len(cases) for cases in reports.values()):
+        output = build_project_workbook(tuple(job.job_id for job in jobs.values()), reports)
+        st.download_button(
+            label=f"📥 Download Project Workbook ({len(reports)} piers)",
+            data=output,
+            file_name="project_loads.xlsx",
+            mime="application/vnd.openpyxl-officedocument.spreadsheetml.sheet"
+        )
+    else:
+        st.warning("⚠️ No data to export. Project workbook will not be created.")
+
+
+def show_preview(df_dict, file_hash):
+    """
+    Data preview of one category, filtered and paged.
     
-    # Function to convert load case to dataframe
-    def convSPtoDF(x, y):
-        lines = [re.split(r'\s{2,}', line.strip()) for line in x.strip().split('\n')]
-        df = pd.DataFrame(lines)
-        return df
+    Only the selected category is rendered (unlike tabs, which render all
+    of them), and only one page of load cases and rows is built from the
+    compact table and sent to the browser.
+    """
+    st.subheader("📋 Data Preview")
+    counts = df_dict.case_counts()
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        category = st.radio("Category", CATEGORIES, horizontal=True, key=f"preview-category-{file_hash}",
+                            format_func=lambda c: f"{c} ({counts[c]})")
+    with col2:
+        view = st.radio("View", ["Table", "Summary"], horizontal=True, key=f"preview-view-{file_hash}",
+                        help="Summary: rows and min/max/sum of the loads per load case")
+    query = st.text_input("Filter load cases", key=f"preview-filter-{file_hash}",
+                          placeholder="Part of a load case name, e.g. STR V")
     
-    # Extract tables from text file
-    text = textog
-    startp = "\n         -------------------------------------------------\n"
-    endp = "\n \n      Auto generation details"
-    sep_line = "-------------------------------------------------"
+    names = [name for name in df_dict.names(category) if query.lower() in name.lower()]
+    if not names:
+        st.info(f"No {category} load cases found." if not query else
+                f"No {category} load cases match '{query}'.")
+        return
     
-    dframedc = pd.DataFrame()
-    dframell = pd.DataFrame()
-    dframebr = pd.DataFrame()
-    dframews = pd.DataFrame()
-    dframewl = pd.DataFrame()
-    dframece = pd.DataFrame()
+    if view == "Summary":
+        summary = build_case_summary(file_hash, df_dict)
+        st.dataframe(summary[summary['load_case'].isin(names)], hide_index=True, use_container_width=True)
+        return
     
-    df_dict = {}
-    loadnameindex = text.find("Loadcase ID:")
-    initial_loadnameindex = loadnameindex  # Save for debugging
-    i = 1
-    max_iterations = 1000  # Safety limit to prevent infinite loops
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        per_page = st.selectbox("Load cases per page", PREVIEW_CASES_PER_PAGE, index=1,
+                                key=f"preview-cases-{file_hash}")
+    pages = -(-len(names) // per_page)
+    with col2:
+        # Keyed by the selection so a narrower filter starts at page 1
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                               key=f"preview-page-{file_hash}-{category}-{query}-{per_page}")
+    page_names = names[(page - 1) * per_page:page * per_page]
+    preview = pd.concat([df_dict[name] for name in page_names], axis=1)
     
-    # Debug counters
-    skipped_empty_data = 0
-    skipped_wrong_columns = 0
-    skipped_empty_dataframe = 0
-    processed_count = 0
-    skipped_pattern_not_found = 0
-    sample_extracted_data = None
-    sample_df_shape = None
+    with col3:
+        rows_per_page = st.selectbox("Rows per page", PREVIEW_ROWS_PER_PAGE, index=1,
+                                     key=f"preview-rows-{file_hash}")
+    row_pages = -(-len(preview) // rows_per_page)
+    with col4:
+        row_page = st.number_input(f"Row page (of {row_pages})", min_value=1, max_value=row_pages, value=1,
+                                   disabled=row_pages == 1,
+                                   key=f"preview-row-page-{file_hash}-{category}-{query}-{page}-{rows_per_page}")
+    first_row = (row_page - 1) * rows_per_page
     
-    # Create progress bar
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    st.caption(f"Load cases {(page - 1) * per_page + 1}-{(page - 1) * per_page + len(page_names)} "
+               f"of {len(names)}, rows {first_row + 1}-{min(first_row + rows_per_page, len(preview))} "
+               f"of {len(preview)}")
+    st.dataframe(preview.iloc[first_row:first_row + rows_per_page], use_container_width=True)
+
+
+def show_diagnostics(diagnostics, debug, file_name, file_hash, expanded):
+    """
+    Diagnostics panel: markers found, skip counters and the recorded issues.
     
-    with st.spinner("Processing load cases..."):
-        while loadnameindex != -1 and i <= max_iterations:
-            # Update progress
-            status_text.text(f"Processing load case {i}...")
-            progress_bar.progress(min(i / max_iterations, 1.0))
-            # Extract load case name
-            if loadnameindex + 13 >= len(text):
-                break
-            if text[loadnameindex+13] != "W":
-                name = text[loadnameindex+13:loadnameindex + 17]
-            else:
-                name = text[loadnameindex+13:loadnameindex + 45]
-                name = name.replace("    Name: ", "-")
-                name = name.replace("\n", "")
-            # Normalize whitespace in name to avoid trailing spaces
-            name = name.strip()
-            
-            # Anchor to the 'Bearing loads:' section for consistent parsing
-            bearing_hdr_idx = text.find("Bearing loads:", loadnameindex)
-            if bearing_hdr_idx == -1:
-                skipped_pattern_not_found += 1
-                # Try to find next load case
-                next_load = text.find("Loadcase ID:", loadnameindex + 1)
-                if next_load == -1:
-                    break
-                text = text[next_load:]
-                loadnameindex = 0
-                i += 1
-                continue
-            
-            # Find the dashed separator line after the 'Bearing loads:' header
-            sep_idx = text.find(sep_line, bearing_hdr_idx)
-            if sep_idx == -1:
-                skipped_pattern_not_found += 1
-                next_load = text.find("Loadcase ID:", loadnameindex + 1)
-                if next_load == -1:
-                    break
-                text = text[next_load:]
-                loadnameindex = 0
-                i += 1
-                continue
-            
-            # Data starts after the newline that follows the dashed line
-            newline_after_sep = text.find('\n', sep_idx)
-            if newline_after_sep == -1:
-                data_start = sep_idx + len(sep_line)
-            else:
-                data_start = newline_after_sep + 1
-            
-            # Data ends at the next load case or at the auto-generation details marker, whichever comes first
-            next_load = text.find("Loadcase ID:", loadnameindex + 1)
-            auto_end = text.find("Auto generation details", data_start)
-            end_candidates = [idx for idx in [next_load, auto_end] if idx != -1]
-            if end_candidates:
-                end_idx = min(end_candidates)
-            else:
-                end_idx = len(text)
-            
-            # Convert to dataframe
-            data = text[data_start:end_idx]
-            
-            # Save sample data from first iteration for debugging
-            if i == 1 and sample_extracted_data is None:
-                sample_extracted_data = data[:500] if len(data) > 500 else data
-            
-            if not data.strip():  # Skip if no data
-                skipped_empty_data += 1
-                text = text[end_idx:]
-                loadnameindex = text.find("Loadcase ID:")
-                i += 1
-                continue
-            
-            df = convSPtoDF(data, name)
-            
-            # Save sample DataFrame shape from first iteration for debugging
-            if i == 1 and sample_df_shape is None:
-                sample_df_shape = df.shape
-            
-            # Keep only the first 4 columns (delete any extra columns)
-            if df.shape[1] > 4:
-                df = df.iloc[:, :4]
-            elif df.shape[1] < 4:
-                # If less than 4 columns, skip this load case
-                skipped_wrong_columns += 1
-                text = text[end_idx:]
-                loadnameindex = text.find("Loadcase ID:")
-                i += 1
-                continue
-            
-            # Add header
-            if df.shape[1] == 4 and len(df) > 0:  # Also check if dataframe has rows
-                processed_count += 1
-                # Ensure unique column names by prefixing with load case name
-                df.columns = [f"{name} - Line#", f"{name} - Bearing#", f"{name} - Direction", f"{name} - Loads-Kips"]
-                
-                # Insert a column with the load case identifier (unique per case)
-                df.insert(0, name, [None] * len(df))
-                
-                # Store in dictionary
-                df_dict[name] = df
-                
-                # Categorize by load type
-                if "DC" in name:
-                    dframedc = pd.concat([dframedc, df], axis=1)
-                elif "WS" in name:
-                    dframews = pd.concat([dframews, df], axis=1)
-                elif "BR" in name:
-                    dframebr = pd.concat([dframebr, df], axis=1)
-                elif "WL" in name:
-                    dframewl = pd.concat([dframewl, df], axis=1)
-                elif "CE" in name:
-                    dframece = pd.concat([dframece, df], axis=1)
-                else:
-                    dframell = pd.concat([dframell, df], axis=1)
-            else:
-                # DataFrame has 4 columns but no rows
-                skipped_empty_dataframe += 1
+    Everything shown was recorded during the parse, so the report text is
+    not kept or scanned again.
+    """
+    title = "🔍 Debug Information" if expanded else (
+        f"🩺 Diagnostics ({diagnostics.errors} errors, {diagnostics.warnings} warnings)")
+    with st.expander(title, expanded=expanded):
+        st.write("**File Analysis:**")
+        markers = diagnostics.markers
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.write(f"Found 'Loadcase ID:': {'✅ ' + str(markers['loadcase']) if markers['loadcase'] else '❌ No'}")
+        with col2:
+            st.write(f"Found 'Bearing loads:': {'✅ ' + str(markers['bearing']) if markers['bearing'] else '❌ No'}")
+        with col3:
+            st.write(f"Found end pattern: {'✅ ' + str(markers['auto']) if markers['auto'] else '❌ No'}")
+        
+        st.write(f"**Processing iterations completed:** {debug['iterations']}")
+        st.write(f"**Successfully processed:** {debug['processed_count']}")
+        st.write(f"**Skipped (pattern not found):** {debug['skipped_pattern_not_found']}")
+        st.write(f"**Skipped (empty data):** {debug['skipped_empty_data']}")
+        st.write(f"**Skipped (wrong column count):** {debug['skipped_wrong_columns']}")
+        st.write(f"**Skipped (empty DataFrame):** {debug['skipped_empty_dataframe']}")
+        
+        if debug["initial_loadnameindex"] == -1:
+            st.warning("⚠️ No 'Loadcase ID:' was found in the file, so the loop never started")
+        
+        # Show sample extracted data from first iteration
+        if debug["sample_extracted_data"] is not None:
+            st.write("**Sample extracted data from first iteration:**")
+            st.code(debug["sample_extracted_data"], language='text')
+            if debug["sample_df_shape"] is not None:
+                st.write(f"**First iteration DataFrame shape:** {debug['sample_df_shape']} (rows x columns)")
+        
+        if diagnostics.issues:
+            st.write(f"**Issues:** {diagnostics.errors} errors, {diagnostics.warnings} warnings "
+                     f"(the first {len(diagnostics.issues)} listed)")
+            issues = pd.DataFrame(diagnostics.issues)
+            st.dataframe(issues.drop(columns="snippet"), hide_index=True, use_container_width=True)
             
-            # Move to next load case - ensure we advance past current position
-            next_pos = end_idx
-            if next_pos >= len(text):
-                break
-            text = text[next_pos:]
-            loadnameindex = text.find("Loadcase ID:")
-            i += 1
-    
-    # Clear progress indicators
-    progress_bar.empty()
-    status_text.empty()
-    
-    if i > max_iterations:
-        st.warning(f"⚠️ Processing stopped after {max_iterations} iterations. Some load cases may not have been processed.")
+            # Report text at one issue
+            choice = st.selectbox("Show the report text of issue", range(len(diagnostics.issues)),
+                                  key=f"diagnostics-issue-{file_hash}",
+                                  format_func=lambda i: f"{i}: {issues['kind'][i]} at offset "
+                                                        f"{issues['offset'][i]} ({issues['load_case'][i]})")
+            snippet = diagnostics.issues[choice]["snippet"]
+            if snippet:
+                st.code(snippet, language='text')
+        
+        st.download_button(
+            label="📥 Download Diagnostics (JSON)",
+            data=diagnostics.to_json(),
+            file_name=pier_name(file_name) + ".diagnostics.json",
+            mime="application/json",
+            key=f"diagnostics-download-{file_hash}",
+        )
+
+
+def show_report(parsed, file_name, file_hash):
+    """Summary, downloads, panels and previews of one converted report"""
+    df_dict = parsed["df_dict"]
+    debug = parsed["debug"]
+    diagnostics = parsed["diagnostics"]
     
     # Display summary
     if len(df_dict) > 0:
         st.success(f"✅ Processed {len(df_dict)} load cases!")
+        if diagnostics.issue_counts:
+            show_diagnostics(diagnostics, debug, file_name, file_hash, expanded=False)
     else:
         st.error("❌ No load cases were processed. Please check the file format.")
         st.info("💡 Make sure the file contains 'Loadcase ID:' markers and the expected data format.")
-        
-        # Debug information
-        with st.expander("🔍 Debug Information", expanded=True):
-            st.write("**File Analysis:**")
-            
-            # Check for key patterns
-            has_loadcase_id = "Loadcase ID:" in textog
-            has_start_pattern = startp.strip() in textog
-            has_end_pattern = endp.strip() in textog
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.write(f"Found 'Loadcase ID:': {'✅ Yes' if has_loadcase_id else '❌ No'}")
-            with col2:
-                st.write(f"Found start pattern: {'✅ Yes' if has_start_pattern else '❌ No'}")
-            with col3:
-                st.write(f"Found end pattern: {'✅ Yes' if has_end_pattern else '❌ No'}")
-            
-            # Count occurrences
-            loadcase_count = textog.count("Loadcase ID:")
-            st.write(f"**Number of 'Loadcase ID:' found:** {loadcase_count}")
-            st.write(f"**Processing iterations completed:** {i-1}")
-            st.write(f"**Successfully processed:** {processed_count}")
-            st.write(f"**Skipped (pattern not found):** {skipped_pattern_not_found}")
-            st.write(f"**Skipped (empty data):** {skipped_empty_data}")
-            st.write(f"**Skipped (wrong column count):** {skipped_wrong_columns}")
-            st.write(f"**Skipped (empty DataFrame):** {skipped_empty_dataframe}")
-            
-            # Show sample extracted data from first iteration
-            if sample_extracted_data is not None:
-                st.write("**Sample extracted data from first iteration:**")
-                st.code(sample_extracted_data, language='text')
-                if sample_df_shape is not None:
-                    st.write(f"**First iteration DataFrame shape:** {sample_df_shape} (rows x columns)")
-            
-            # Check if loop exited early
-            if initial_loadnameindex == -1:
-                st.warning("⚠️ No 'Loadcase ID:' was found in the file, so the loop never started")
-            elif i > max_iterations:
-                st.warning(f"⚠️ Processing stopped at maximum iterations ({max_iterations})")
-            elif loadnameindex == -1:
-                st.info("ℹ️ Loop exited because no more 'Loadcase ID:' patterns were found")
-            
-            # Show sample text around first Loadcase ID if found
-            if has_loadcase_id:
-                first_idx = textog.find("Loadcase ID:")
-                sample_start = max(0, first_idx - 100)
-                sample_end = min(len(textog), first_idx + 500)
-                st.write("**Sample text around first 'Loadcase ID:':**")
-                st.code(textog[sample_start:sample_end], language='text')
-                
-                # Try to extract and show what data would be extracted
-                try:
-                    test_start = textog.find(startp, first_idx)
-                    test_end = textog.find(endp, first_idx)
-                    if test_start != -1 and test_end != -1 and test_end > test_start:
-                        extracted_data = textog[test_start+len(startp):test_end]
-                        st.write("**Sample extracted data (between patterns):**")
-                        if extracted_data.strip():
-                            st.code(extracted_data[:500] + ("..." if len(extracted_data) > 500 else ""), language='text')
-                            # Try to create a test DataFrame
-                            test_df = convSPtoDF(extracted_data, "TEST")
-                            st.write(f"**Test DataFrame shape:** {test_df.shape} (rows x columns)")
-                            if len(test_df) > 0:
-                                st.write("**First few rows of test DataFrame:**")
-                                st.dataframe(test_df.head(), use_container_width=True)
-                        else:
-                            st.warning("⚠️ Extracted data is empty!")
-                except Exception as e:
-                    st.write(f"**Error testing extraction:** {str(e)}")
-            
-            # Show the patterns being searched for
-            st.write("**Patterns being searched:**")
-            st.write(f"- Start pattern: `{repr(startp)}`")
-            st.write(f"- End pattern: `{repr(endp)}`")
-            
-            # Try to find the actual pattern in the file
-            if has_loadcase_id:
-                first_idx = textog.find("Loadcase ID:")
-                # Look for the separator line near the first load case
-                search_area = textog[first_idx:first_idx+1000]
-                if "-------------------------------------------------" in search_area:
-                    sep_idx = search_area.find("-------------------------------------------------")
-                    context_start = max(0, sep_idx - 20)
-                    context_end = min(len(search_area), sep_idx + 50)
-                    actual_pattern = search_area[context_start:context_end]
-                    st.write("**Actual separator pattern found in file:**")
-                    st.code(repr(actual_pattern), language='text')
+        show_diagnostics(diagnostics, debug, file_name, file_hash, expanded=True)
     
-    # Show statistics
-    col1, col2, col3, col4, col5, col6 = st.columns(6)
-    with col1:
-        st.metric("DC Cases", len([k for k in df_dict.keys() if "DC" in k]))
-    with col2:
-        st.metric("LL Cases", len([k for k in df_dict.keys() if "LL" in k and "DC" not in k and "WS" not in k and "BR" not in k and "WL" not in k and "CE" not in k]))
-    with col3:
-        st.metric("BR Cases", len([k for k in df_dict.keys() if "BR" in k]))
-    with col4:
-        st.metric("WS Cases", len([k for k in df_dict.keys() if "WS" in k]))
-    with col5:
-        st.metric("WL Cases", len([k for k in df_dict.keys() if "WL" in k]))
-    with col6:
-        st.metric("CE Cases", len([k for k in df_dict.keys() if "CE" in k]))
-    
-    # Create Excel file in memory only if there's data to write
-    has_data = (not dframedc.empty or not dframell.empty or not dframebr.empty or 
-                not dframews.empty or not dframewl.empty or not dframece.empty)
+    # Show statistics; the counts come from the same classification that
+    # routes the load cases to the sheets
+    counts = df_dict.case_counts()
+    for col, category in zip(st.columns(len(CATEGORIES)), CATEGORIES):
+        with col:
+            st.metric(f"{category} Cases", counts[category])
     
-    if has_data:
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            if not dframedc.empty:
-                dframedc.to_excel(writer, sheet_name='DC', index=False)
-            if not dframell.empty:
-                dframell.to_excel(writer, sheet_name='LL', index=False)
-            if not dframebr.empty:
-                dframebr.to_excel(writer, sheet_name='BR', index=False)
-            if not dframews.empty:
-                dframews.to_excel(writer, sheet_name='WS', index=False)
-            if not dframewl.empty:
-                dframewl.to_excel(writer, sheet_name='WL', index=False)
-            if not dframece.empty:
-                dframece.to_excel(writer, sheet_name='CE', index=False)
-        
-        output.seek(0)
+    # The workbook only exists when there's data to write
+    if parsed["workbook"] is not None:
+        output = parsed["workbook"]
         
         # Download button
-        excel_filename = uploaded_file.name.replace(".txt", ".xlsx")
+        excel_filename = file_name.replace(".txt", ".xlsx")
         st.download_button(
             label="📥 Download Excel File",
             data=output,
             file_name=excel_filename,
             mime="application/vnd.openpyxl-officedocument.spreadsheetml.sheet"
         )
+        
+        # One row per table line, for scripts that aggregate the loads
+        table_format = st.selectbox("Long format table", TABLE_FORMATS, index=0,
+                                    help="Columns: load_case, category, line, bearing, direction, load_kips")
+        try:
+            table = build_table(file_hash, encoding_choice, table_format, df_dict)
+            st.download_button(
+                label=f"📥 Download Long Table ({table_format})",
+                data=table,
+                file_name=file_name.replace(".txt", f".{table_format}"),
+                mime=TABLE_MIME_TYPES[table_format]
+            )
+        except ImportError as e:
+            st.warning(f"⚠️ {e}")
     else:
         st.warning("⚠️ No data to export. Excel file will not be created.")
     
-    # Display preview of data
-    st.subheader("📋 Data Preview")
-    
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["DC", "LL", "BR", "WS", "WL", "CE"])
+    if df_dict:
+        show_combinations(file_hash, encoding_choice, df_dict, file_name)
     
-    with tab1:
-        if not dframedc.empty:
-            st.dataframe(dframedc, use_container_width=True)
-        else:
-            st.info("No DC load cases found.")
+    # Timings of the (cached) parse and export of this upload
+    show_performance(parsed["stats"], parsed["export_seconds"])
     
-    with tab2:
-        if not dframell.empty:
-            st.dataframe(dframell, use_container_width=True)
-        else:
-            st.info("No LL load cases found.")
-    
-    with tab3:
-        if not dframebr.empty:
-            st.dataframe(dframebr, use_container_width=True)
-        else:
-            st.info("No BR load cases found.")
-    
-    with tab4:
-        if not dframews.empty:
-            st.dataframe(dframews, use_container_width=True)
-        else:
-            st.info("No WS load cases found.")
-    
-    with tab5:
-        if not dframewl.empty:
-            st.dataframe(dframewl, use_container_width=True)
-        else:
-            st.info("No WL load cases found.")
-    
-    with tab6:
-        if not dframece.empty:
-            st.dataframe(dframece, use_container_width=True)
-        else:
-            st.info("No CE load cases found.")
+    # Preview of one category and page of load cases at a time
+    show_preview(df_dict, file_hash)
     
     # Show all load case names
     with st.expander("📝 View all load case names"):
         st.write(list(df_dict.keys()))
 
+
+# File upload
+uploaded_files = st.file_uploader("Choose text files (one report per pier)", type=['txt'],
+                                  accept_multiple_files=True)
+encoding_choice = st.selectbox("File encoding", ENCODING_CHOICES, index=0)
+
+manager = get_job_manager()
+# Keep the jobs of this session (its uploads and Recent conversions)
+# while other sessions submit theirs
+manager.hold(session_id(), st.session_state.get("job_ids", ()))
+
+if uploaded_files:
+    # Every report is converted in its own background worker; identical
+    # uploads (also after a browser refresh or from another session)
+    # reuse the same job
+    job_ids = [submit_upload(manager, uploaded, encoding_choice) for uploaded in uploaded_files]
+    # Uploads of the same file name (e.g. from different folders) are numbered
+    names = unique_names([uploaded.name for uploaded in uploaded_files])
+    jobs = {name: manager.get(job_id) for name, job_id in zip(names, job_ids)}
+    if any(job is None for job in jobs.values()):
+        # Dropped between the submit and now (a hold that expired); the
+        # rerun submits it again
+        st.rerun()
+    show_recent_jobs(manager)
+    
+    pending = {name: job for name, job in jobs.items() if job.status in ("queued", "running")}
+    if pending:
+        done_count = len(jobs) - len(pending)
+        # A pending job counts with the parse progress its worker reported
+        progress = (done_count + sum(job.progress[0] for job in pending.values())) / len(jobs)
+        st.progress(min(progress, 1.0))
+        st.info(f"⏳ Converted {done_count} of {len(jobs)} reports. An identical upload reuses the "
+                "running conversion, also after a browser refresh.")
+        for name, job in pending.items():
+            st.caption(job_status(name, job))
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
+    
+    for name, job in jobs.items():
+        if job.status == "failed":
+            st.error(f"❌ Conversion of {name} failed: {job.error}")
+    done = {name: job for name, job in jobs.items() if job.status == "done"}
+    if not done:
+        st.stop()
+    
+    if len(jobs) > 1:
+        show_project(done)
+        st.subheader("🔎 Report details")
+        selected = st.selectbox("Report", list(done))
+    else:
+        selected = next(iter(done))
+    show_report(done[selected].result(), selected, done[selected].job_id)
+
 else:
+    show_recent_jobs(manager)
     st.info("👆 Please upload a text file to get started.")
     st.markdown("""
     ### How to use:
-    1. Upload a text file containing RCPier load case data
+    1. Upload one or more text files containing RCPier load case data (one per pier)
     2. The app will automatically process the file
     3. Download the converted Excel file with organized sheets
-    4. Preview the data in the tabs below
+    4. Preview the data one category at a time, filtered and paged
     """)
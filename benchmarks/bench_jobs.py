@@ -0,0 +1,76 @@
+"""
+Concurrency benchmark for the upload job queue.
+
+Simulates several engineers uploading large reports at once: every
+upload is submitted from its own thread, like concurrent Streamlit
+sessions. Reports how long a submit blocks the caller (it must stay
+near zero for the server to remain responsive), the time until each
+job is done, the overall throughput, and checks that an identical
+upload reuses its finished job.
+
+Usage:
+    python benchmarks/bench_jobs.py [uploads] [n_cases] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_report import make_report
+from upload_jobs import DEFAULT_WORKERS, JobManager
+
+
+def run(uploads, n_cases, workers):
+    # Distinct reports, so no upload is deduplicated against another
+    reports = [make_report(n_cases + k).encode("ascii") for k in range(uploads)]
+    manager = JobManager(workers=workers)
+    # Start the worker processes before timing
+    manager.wait(manager.submit(make_report(1).encode("ascii"), "Auto-detect"))
+    
+    submit_times = [0.0] * uploads
+    job_ids = [None] * uploads
+    
+    def upload(k):
+        start = time.perf_counter()
+        job_ids[k] = manager.submit(reports[k], "Auto-detect", name=f"report_{k}.txt")
+        submit_times[k] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    threads = [threading.Thread(target=upload, args=(k,)) for k in range(uploads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    jobs = [manager.wait(job_id) for job_id in job_ids]
+    elapsed = time.perf_counter() - start
+    
+    failed = [job for job in jobs if job.status != "done"]
+    total_mb = sum(len(report) for report in reports) / 1e6
+    print(f"Uploads: {uploads} x ~{n_cases} load cases ({total_mb:.1f} MB), workers: {manager.workers}")
+    print(f"  Submit latency: max {max(submit_times) * 1e3:.1f} ms, "
+          f"mean {sum(submit_times) / uploads * 1e3:.1f} ms")
+    print(f"  Job completion: min {min(job.elapsed for job in jobs):.2f} s, "
+          f"max {max(job.elapsed for job in jobs):.2f} s")
+    print(f"  Wall time: {elapsed:.2f} s, {uploads / elapsed:.2f} uploads/s, {total_mb / elapsed:.2f} MB/s")
+    print(f"  Failed: {len(failed)}")
+    
+    start = time.perf_counter()
+    reused = manager.submit(reports[0], "Auto-detect")
+    print(f"  Identical upload reused job: {reused == job_ids[0]} "
+          f"({(time.perf_counter() - start) * 1e3:.1f} ms)")
+    manager.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent uploads through the job queue")
+    parser.add_argument("uploads", nargs="?", type=int, default=8)
+    parser.add_argument("n_cases", nargs="?", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"worker processes (default: {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+    sys.exit(run(args.uploads, args.n_cases, args.workers))
@@ -0,0 +1,236 @@
+"""
+Benchmark suite for the RCPier parser and the Excel export.
+
+Generates synthetic reports with 10 to 10,000 load cases and measures,
+for each size, the parse_report() time (in memory and streamed), the
+workbook export time (building the wide sheets included), the long
+table export time, the memory held by a parse result, the peak
+memory of a parse and of an export, and the end-to-end time of the
+command line inspecting the report in a fresh process. Linear scaling
+shows up as a roughly constant time per load case. Each workbook is
+read back once to check that no column was lost to the column limit of
+an Excel worksheet (the 10,000 case sheets are split).
+
+The startup time of the command line (--help in a fresh interpreter,
+next to a bare interpreter start) is measured once; it dominates the
+conversion of small reports in scripted per-file loops.
+
+Results can be saved as JSON and compared against an earlier run; the
+script exits with status 1 when a metric regresses by more than the
+tolerance, so it can gate changes on large reports.
+
+Usage:
+    python benchmarks/run_benchmarks.py [n_cases ...] [--repeat N]
+        [--json results.json] [--baseline baseline.json] [--tolerance 0.25]
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from synthetic_report import write_report
+from excel_export import EXCEL_MAX_COLUMNS, write_workbook
+from rcpier_parser import BLOCK_WIDTH, parse_report
+from table_export import write_table
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+# Metrics compared against a baseline; all are "lower is better"
+TRACKED_METRICS = ["parse_s", "stream_parse_s", "export_s", "long_export_s",
+                   "result_mb", "parse_peak_mb", "export_peak_mb", "cli_inspect_s", "startup_s"]
+
+# Command line whose startup and end-to-end time is measured
+CLI_PATH = os.path.join(REPO_DIR, "extract_loads_rcpier.py")
+
+# Format of the long table export; Parquet needs pyarrow
+try:
+    import pyarrow  # noqa: F401
+    LONG_FORMAT = "parquet"
+except ImportError:
+    LONG_FORMAT = "csv"
+
+# Timings this short are dominated by noise and never flagged
+MIN_COMPARED_SECONDS = 0.005
+
+
+def best_time(func, repeat):
+    """Return the best wall time of repeat calls of func() in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(func):
+    """Return the peak traced allocation of func() in MB"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1e6
+
+
+def command_time(args, repeat):
+    """Return the best wall time of running the interpreter with args in seconds"""
+    return best_time(lambda: subprocess.run([sys.executable] + args, check=True,
+                                            capture_output=True), repeat)
+
+
+def export(result, target=None):
+    write_workbook(target if target is not None else io.BytesIO(), result.frames, column_group=BLOCK_WIDTH)
+
+
+def check_widths(result):
+    """
+    Check that the workbook holds every column of the wide sheets.
+    
+    Sheets wider than Excel allows are split into parts; the parts must
+    stay within EXCEL_MAX_COLUMNS and add up to the width of the sheet.
+    """
+    from openpyxl import load_workbook
+    
+    output = io.BytesIO()
+    export(result, output)
+    output.seek(0)
+    workbook = load_workbook(output, read_only=True)
+    widths = {}
+    for worksheet in workbook.worksheets:
+        assert worksheet.max_column <= EXCEL_MAX_COLUMNS, \
+            f"sheet {worksheet.title} has {worksheet.max_column} columns"
+        category = worksheet.title.split("_")[0]
+        widths[category] = widths.get(category, 0) + worksheet.max_column
+    workbook.close()
+    for category, df in result.frames.items():
+        written = widths.get(category, 0) if not df.empty else 0
+        assert written == df.shape[1], f"{category}: wrote {written} of {df.shape[1]} columns"
+
+
+def retained_memory(func):
+    """Return the traced memory still held by the result of func() in MB"""
+    tracemalloc.start()
+    try:
+        result = func()
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return held / 1e6
+
+
+def bench_size(path, n_cases, repeat):
+    """Measure one synthetic report"""
+    result = parse_report(path)
+    assert len(result.df_dict) == n_cases, f"parsed {len(result.df_dict)} of {n_cases} load cases"
+    check_widths(result)
+    
+    return {
+        "cases": n_cases,
+        "mb": os.path.getsize(path) / 1e6,
+        "parse_s": best_time(lambda: parse_report(path), repeat),
+        "stream_parse_s": best_time(lambda: parse_report(path, stream=True), repeat),
+        "export_s": best_time(lambda: export(result), repeat),
+        "long_export_s": best_time(lambda: write_table(io.BytesIO(), result.long, LONG_FORMAT), repeat),
+        "result_mb": retained_memory(lambda: parse_report(path)),
+        "parse_peak_mb": peak_memory(lambda: parse_report(path)),
+        "export_peak_mb": peak_memory(lambda: export(result)),
+        "cli_inspect_s": command_time([CLI_PATH, "inspect", path], repeat),
+    }
+
+
+def bench_startup(repeat):
+    """Startup time of the command line; stored as the entry of 0 load cases"""
+    return {
+        "cases": 0,
+        "python_s": command_time(["-c", "pass"], repeat),
+        "startup_s": command_time([CLI_PATH, "--help"], repeat),
+    }
+
+
+def run(sizes, repeat=3):
+    startup = bench_startup(repeat)
+    print(f"CLI startup: {startup['startup_s']:.3f} s (--help), "
+          f"interpreter alone {startup['python_s']:.3f} s\n")
+    print(f"{'cases':>8} {'MB':>8} {'parse s':>10} {'stream s':>10} {'export s':>10} "
+          f"{'long exp s':>10} {'us/case':>10} {'result MB':>10} {'parse MB':>10} {'export MB':>10} "
+          f"{'cli s':>10}")
+    results = [startup]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for n_cases in sizes:
+            path = os.path.join(tmpdir, f"report_{n_cases}.txt")
+            write_report(path, n_cases)
+            r = bench_size(path, n_cases, repeat)
+            results.append(r)
+            per_case = r["parse_s"] / n_cases * 1e6
+            print(f"{n_cases:>8} {r['mb']:>8.2f} {r['parse_s']:>10.4f} {r['stream_parse_s']:>10.4f} "
+                  f"{r['export_s']:>10.4f} {r['long_export_s']:>10.4f} "
+                  f"{per_case:>10.1f} {r['result_mb']:>10.1f} {r['parse_peak_mb']:>10.1f} "
+                  f"{r['export_peak_mb']:>10.1f} {r['cli_inspect_s']:>10.4f}")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline run.
+    
+    Returns:
+        list: Messages of the metrics that grew by more than tolerance
+    """
+    previous = {r["cases"]: r for r in baseline}
+    regressions = []
+    for r in results:
+        old = previous.get(r["cases"])
+        if old is None:
+            continue
+        for metric in TRACKED_METRICS:
+            if metric not in old or metric not in r:
+                continue
+            if metric.endswith("_s") and old[metric] < MIN_COMPARED_SECONDS:
+                continue
+            if r[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{r['cases']} cases: {metric} {old[metric]:.4f} -> {r[metric]:.4f}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the RCPier parser and Excel export")
+    parser.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES,
+                        help="load case counts of the synthetic reports")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per measurement; the best one is kept")
+    parser.add_argument("--json", default=None,
+                        help="save the results to this JSON file")
+    parser.add_argument("--baseline", default=None,
+                        help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative growth of a metric (default: 0.25)")
+    args = parser.parse_args()
+    
+    results = run(args.sizes, repeat=args.repeat)
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.json}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
@@ -0,0 +1,106 @@
+"""
+Synthetic RCPier report generator used by the benchmarks.
+
+The generated text follows the layout of a real RCPier "LOADS" report:
+a preamble, one block per load case and a "Selected load groups" tail.
+Like real live load tables, LL tables list every bearing a second time
+with an "L" flag column after the load.
+"""
+
+import random
+
+
+PREAMBLE = """\x0c
+
+
+LOADS
+=====
+
+Pier View   : Downstation.
+   Load Cases: {count}
+   Longitudinal Reaction: Simple Span Distribution
+
+Generate Braking/Longitudinal Force = Selected
+Generate Centrifugal Force = Selected
+
+
+"""
+
+CASE_TEMPLATE = """      Loadcase ID: {case_id:<8}Name: {title}
+      Multiplier =  1.000
+      
+      Bearing loads:
+         Line #    Bearing #   Dir.    Load,  kips
+         -------------------------------------------------
+{rows}
+
+      Auto generation details
+      
+      Generated Dead Load
+         Slab weight    =   150.00     pcf   Girder weight =   150.00     pcf
+
+
+"""
+
+TAIL = """Selected load groups
+
+      Group 1: DC1 LL1 BR1
+"""
+
+# Share of each load category in a generated report
+CATEGORY_MIX = [("DC", 0.02), ("LL", 0.45), ("BR", 0.35), ("WS", 0.08), ("WL", 0.05), ("CE", 0.05)]
+
+WIND_TITLES = ["STR III-Angle: 0", "SER IV-Angle: 0", "STR V-Angle: 0", "Angle: 0"]
+
+
+def make_case(case_id, lines=2, bearings=7, seed=0):
+    """Return the text block of one load case"""
+    rng = random.Random(seed)
+    directions = "XYZ" if case_id.startswith("W") else "Y"
+    flags = ["        ", "       L"] if case_id.startswith("LL") else ["        "]
+    rows = []
+    for flag in flags:
+        for line in range(1, lines + 1):
+            for bearing in range(1, bearings + 1):
+                for direction in directions:
+                    load = rng.uniform(-150.0, 150.0)
+                    rows.append("           %d          %d         %s      %7.2f%s" % (
+                        line, bearing, direction, load, flag))
+    title = WIND_TITLES[seed % len(WIND_TITLES)] if case_id.startswith("W") else ""
+    return CASE_TEMPLATE.format(case_id=case_id, title=title, rows="\n".join(rows))
+
+
+def make_report(n_cases, lines=2, bearings=7):
+    """
+    Build a synthetic report with n_cases load cases.
+    
+    Args:
+        n_cases: Number of load cases
+        lines: Number of bearing lines per case
+        bearings: Number of bearings per line
+    
+    Returns:
+        str: Report text
+    """
+    counts = {}
+    blocks = [PREAMBLE.format(count=n_cases)]
+    for k in range(n_cases):
+        # Deterministic category assignment following CATEGORY_MIX
+        position = (k + 0.5) / n_cases
+        cumulative = 0.0
+        for category, share in CATEGORY_MIX:
+            cumulative += share
+            if position <= cumulative:
+                break
+        counts[category] = counts.get(category, 0) + 1
+        case_id = "%s%d" % (category, counts[category])
+        blocks.append(make_case(case_id, lines, bearings, seed=k))
+    blocks.append(TAIL)
+    return "".join(blocks)
+
+
+def write_report(path, n_cases, **kwargs):
+    """Write a synthetic report to path and return the path"""
+    with open(path, "w", encoding="ascii") as f:
+        f.write(make_report(n_cases, **kwargs))
+    return path
@@ -0,0 +1,130 @@
+"""
+Streaming Excel writers for the converted load sheets.
+
+Both backends write rows in order without building a per-cell object
+model: XlsxWriter in constant_memory mode, or openpyxl in write_only
+mode when XlsxWriter is not installed.
+
+pandas is only imported once a workbook is written, so importing
+EXCEL_ENGINES (e.g. for command line choices) stays cheap.
+"""
+
+
+# Writer backends; "auto" picks the fastest one available
+EXCEL_ENGINES = ("auto", "xlsxwriter", "openpyxl")
+
+# Size limits of an Excel worksheet (column XFD is the last one)
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_COLUMNS = 16_384
+
+
+def _rows(df):
+    """Yield the header and the data rows of a frame as plain Python values"""
+    import pandas as pd
+    
+    yield [str(col) for col in df.columns]
+    values = df.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    yield from values.tolist()
+
+
+def _write_xlsxwriter(target, sheets):
+    import xlsxwriter
+    
+    # constant_memory flushes each row to disk once the next row starts
+    workbook = xlsxwriter.Workbook(target, {'constant_memory': True})
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.add_worksheet(sheet_name)
+        for row_idx, row in enumerate(_rows(df)):
+            worksheet.write_row(row_idx, 0, row)
+    workbook.close()
+
+
+def _write_openpyxl(target, sheets):
+    from openpyxl import Workbook
+    
+    workbook = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name)
+        for row in _rows(df):
+            worksheet.append(row)
+    workbook.save(target)
+
+
+def resolve_engine(engine="auto"):
+    """
+    Return the writer backend to use for engine.
+    
+    "auto" and "xlsxwriter" fall back to openpyxl when XlsxWriter is not
+    installed.
+    """
+    if engine not in EXCEL_ENGINES:
+        raise ValueError(f"Unknown Excel engine '{engine}', expected one of {EXCEL_ENGINES}")
+    if engine in ("auto", "xlsxwriter"):
+        try:
+            import xlsxwriter  # noqa: F401
+            return "xlsxwriter"
+        except ImportError:
+            return "openpyxl"
+    return engine
+
+
+def split_sheets(sheets, column_group=1):
+    """
+    Fit the sheets into the size limits of an Excel worksheet.
+    
+    A sheet wider than EXCEL_MAX_COLUMNS is split into parts named
+    "<name>_1", "<name>_2", ... Parts are only cut between groups of
+    column_group columns, so a load case block is never split across two
+    sheets. Rows cannot be split that way: a sheet longer than
+    EXCEL_MAX_ROWS (header included) raises ValueError.
+    
+    Args:
+        sheets: dict sheet name -> DataFrame, in sheet order
+        column_group: Number of columns that must stay on the same sheet
+    
+    Returns:
+        dict: sheet name -> DataFrame, every frame within the limits
+    """
+    width = EXCEL_MAX_COLUMNS - EXCEL_MAX_COLUMNS % column_group
+    fitted = {}
+    for name, df in sheets.items():
+        n_rows, n_columns = df.shape
+        if n_rows + 1 > EXCEL_MAX_ROWS:
+            raise ValueError(f"Sheet '{name}' has {n_rows} rows, more than the {EXCEL_MAX_ROWS - 1} "
+                             f"an Excel worksheet holds below its header; use a long table format instead")
+        if n_columns <= EXCEL_MAX_COLUMNS:
+            fitted[name] = df
+            continue
+        for part, start in enumerate(range(0, n_columns, width), start=1):
+            fitted[f"{name}_{part}"] = df.iloc[:, start:start + width]
+    return fitted
+
+
+def write_workbook(target, sheets, engine="auto", column_group=1):
+    """
+    Write load sheets to an Excel workbook, skipping empty frames.
+    
+    Sheets too wide for Excel are split (see split_sheets()).
+    
+    Args:
+        target: Output path or binary file object (e.g. BytesIO)
+        sheets: dict sheet name -> DataFrame, in sheet order
+        engine: One of EXCEL_ENGINES
+        column_group: Number of columns that must stay on the same sheet
+            when a sheet is split, e.g. rcpier_parser.BLOCK_WIDTH
+    
+    Returns:
+        str: The backend that wrote the workbook
+    """
+    sheets = {name: df for name, df in sheets.items() if not df.empty}
+    if not sheets:
+        raise ValueError("No data to write: every sheet is empty")
+    sheets = split_sheets(sheets, column_group)
+    
+    engine = resolve_engine(engine)
+    if engine == "xlsxwriter":
+        _write_xlsxwriter(target, sheets)
+    else:
+        _write_openpyxl(target, sheets)
+    return engine
@@ -1,159 +1,709 @@
 """
 Standalone Python script version of Extract Loads RCPier notebook.
 This script can be run from command line or imported as a module.
+
+Command line:
+    extract_loads_rcpier.py [convert] REPORT ...   convert reports (the default command)
+    extract_loads_rcpier.py batch REPORT ...       convert reports in parallel
+    extract_loads_rcpier.py inspect REPORT         parse and validate without writing
+    extract_loads_rcpier.py watch FOLDER           convert reports as they are written
+
+pandas, NumPy and the parser are imported by the functions that need
+them, so --help and argument errors return without loading them.
 """
 
-import numpy as np
-from pandas import Series, DataFrame
-import pandas as pd
-import re
-import chardet
 import sys
 import os
+import io
+import glob
+import time
+import argparse
+import contextlib
 
+from excel_export import EXCEL_ENGINES
+from load_classification import CATEGORIES, default_classifier, load_rules
+from parse_diagnostics import ParseDiagnostics
+from pipeline_stats import PipelineStats, profile_to
+from result_cache import DEFAULT_CACHE_DIR, ResultCache
+from table_export import TABLE_FORMATS
 
-def convSPtoDF(x, y):
-    """Convert load case to dataframe"""
-    lines = [re.split(r'\s{2,}', line.strip()) for line in x.strip().split('\n')]
-    df = pd.DataFrame(lines)
-    return df
+# Output formats: the wide Excel workbook or a long table (see table_export)
+OUTPUT_FORMATS = ("xlsx",) + TABLE_FORMATS
 
 
-def process_rcpier_file(file_path):
+def process_rcpier_file(file_path, stream=False, encoding=None, cache=None, stats=None,
+                        layout="wide", classifier=None, diagnostics=None):
     """
     Process RCPier text file and extract load cases.
     
     Args:
         file_path: Path to the text file
-        
+        stream: Read the report chunk by chunk instead of loading it whole,
+            so peak memory is bounded by the largest load case
+        encoding: Text encoding of the report, detected when None
+        cache: Optional result_cache.ResultCache; an unchanged report is
+            loaded from it without decoding or parsing. It stores the
+            compact load case table, shared by both layouts
+        stats: Optional pipeline_stats.PipelineStats receiving the stage
+            timings and counters
+        layout: "wide" for the per-category frames, "long" for a single
+            tidy frame (see rcpier_parser.LONG_COLUMNS)
+        classifier: load_classification.LoadCaseClassifier routing the load
+            cases to sheets, default_classifier() when None
+        diagnostics: Optional parse_diagnostics.ParseDiagnostics receiving
+            the issues of the parse (cached along with the table)
+    
     Returns:
-        tuple: (df_dict, dframedc, dframell, dframebr, dframews, dframewl)
+        tuple: (df_dict, dframedc, dframell, dframebr, dframews, dframewl, dframece)
+        for the wide layout, or the tidy DataFrame for the long layout
     """
-    # Convert the LPILE txt report to strings
-    with open(file_path, 'rb') as f:
-        result = chardet.detect(f.read())
-        xencode = result['encoding']
+    from rcpier_parser import parse_report
+    
+    stats = stats if stats is not None else PipelineStats()
+    classifier = classifier if classifier is not None else default_classifier()
+    diagnostics = diagnostics if diagnostics is not None else ParseDiagnostics()
+    df_dict = None
+    if cache is not None:
+        with stats.stage("cache"):
+            # Other rules route the same report differently
+            cache_key = cache.key(file_path, encoding, classifier.key)
+            cached = cache.get(cache_key)
+        if cached is not None:
+            df_dict, cached_diagnostics = cached
+            diagnostics.merge(cached_diagnostics)
+            stats.bytes = os.path.getsize(file_path)
+            stats.load_cases = len(df_dict.cases)
+            stats.rows = len(df_dict.table)
+            print(f"Loaded {stats.load_cases} load cases from cache")
     
-    print(f"Detected encoding: {xencode}")
+    if df_dict is None:
+        parsed = parse_report(file_path, encoding=encoding, stream=stream, stats=stats,
+                              classifier=classifier, diagnostics=diagnostics)
+        
+        print(f"Detected encoding: {parsed.encoding}")
+        print(f"First loadcase found at index: {parsed.first_loadcase_index}")
+        print(f"Processed {parsed.counters['processed']} load cases")
+        
+        df_dict = parsed.df_dict
+        if layout == "wide":
+            print(f"Load case names: {list(df_dict.keys())}")
+        if cache is not None:
+            with stats.stage("cache"):
+                cache.put(cache_key, (df_dict, diagnostics))
+    if diagnostics.issue_counts:
+        print(diagnostics.summary())
+    
+    if layout == "long":
+        return df_dict.table
+    # The wide frames are only built for the workbook
+    with stats.stage("assemble"):
+        frames = df_dict.frames()
+    return (df_dict,) + tuple(frames[category] for category in CATEGORIES)
+
+
+def output_path(file_path, fmt="xlsx", output_dir=None, suffix=""):
+    """
+    Path of the output file of a report.
+    
+    The workbook replaces ".txt" in the report path by ".xlsx"; a long
+    table replaces the extension by fmt, after appending suffix to the
+    report name. Both go into output_dir when given.
+    """
+    if fmt == "xlsx":
+        path = file_path.replace(".txt", ".xlsx")
+    else:
+        path = os.path.splitext(file_path)[0] + suffix + "." + fmt
+    if output_dir is not None:
+        path = os.path.join(output_dir, os.path.basename(path))
+    return path
+
+
+def save_to_excel(file_path, dframedc, dframell, dframebr, dframews, dframewl, dframece=None,
+                  output_dir=None, engine="auto", stats=None, extra_sheets=None):
+    """
+    Save dataframes to Excel file.
+    
+    The workbook is written next to the report, or into output_dir when
+    given. engine selects the streaming writer backend (see
+    excel_export.EXCEL_ENGINES). The write is timed as the "export" stage
+    of stats when given. extra_sheets (sheet name -> DataFrame) are
+    appended after the load sheets.
+    """
+    from excel_export import write_workbook
+    from rcpier_parser import BLOCK_WIDTH
+    
+    stats = stats if stats is not None else PipelineStats()
+    excelfilename = output_path(file_path, "xlsx", output_dir)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    with stats.stage("export"):
+        write_workbook(excelfilename, {
+            'DC': dframedc,
+            'LL': dframell,
+            'BR': dframebr,
+            'WS': dframews,
+            'WL': dframewl,
+            **({'CE': dframece} if dframece is not None else {}),
+            **(extra_sheets or {}),
+        }, engine=engine, column_group=BLOCK_WIDTH)
+    
+    print(f"Excel file saved as: {excelfilename}")
+    return excelfilename
+
+
+def save_table(file_path, df, fmt, output_dir=None, stats=None, suffix=""):
+    """
+    Save the long load table as Parquet, Feather or CSV.
+    
+    The file is written next to the report with fmt as its extension, or
+    into output_dir when given. suffix is appended to the report name
+    (e.g. "_envelope" for other tables of the same report).
+    """
+    from table_export import write_table
+    
+    stats = stats if stats is not None else PipelineStats()
+    filename = output_path(file_path, fmt, output_dir, suffix)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    with stats.stage("export"):
+        write_table(filename, df, fmt)
+    
+    print(f"{fmt.capitalize()} file saved as: {filename}")
+    return filename
+
+
+def combination_tables(data, combinations=None, stats=None):
+    """
+    Factored load combinations and their envelope for a parsed report.
     
-    with open(file_path, 'r', encoding=xencode) as f:
-        textog = f.read()
+    Args:
+        data: Long load table or df_dict of the report
+        combinations: Factor table, load_combinations.DEFAULT_COMBINATIONS when None
     
-    # Define the begin and end pattern for the re.
-    startp = "\n         -------------------------------------------------\n"
-    endp = "\n \n      Auto generation details"
+    Returns:
+        dict: "Combinations" and "Envelope" frames
+    """
+    from load_combinations import combine_loads, envelope
     
-    # Remove everything after "Selected load groups"
-    if "Selected load groups" in textog:
-        textog = textog[:textog.find("Selected load groups")]
+    stats = stats if stats is not None else PipelineStats()
+    with stats.stage("combine"):
+        results = combine_loads(data, combinations)
+        return {"Combinations": results, "Envelope": envelope(results)}
+
+
+def convert_report(file_path, output_dir=None, stream=False, encoding=None, engine="auto",
+                   cache=None, stats=None, fmt="xlsx", combinations=False, classifier=None,
+                   diagnostics=None, output_name=None):
+    """
+    Parse one report and write it in the requested output format.
     
-    # Extract table from txt file
-    # Main Code
-    text = textog
-    i = 1
-    df_dict = {}
+    combinations is a factor table, None for the default table or False
+    to skip the load combinations. They become extra workbook sheets, or
+    _combinations and _envelope files next to a long table. classifier
+    routes the load cases and diagnostics receives the parse issues, see
+    process_rcpier_file(). output_name replaces the report's file name
+    in the output names (e.g. "P1 (2).txt" for a second "P1.txt").
     
-    dframedc = pd.DataFrame()
-    dframell = pd.DataFrame()
-    dframebr = pd.DataFrame()
-    dframews = pd.DataFrame()
-    dframewl = pd.DataFrame()
+    Returns:
+        tuple: (output path, number of load cases, the LoadCaseTable of the
+        workbook or None for a long table)
+    """
+    named = named_path(file_path, output_name)
+    if fmt == "xlsx":
+        df_dict, *frames = process_rcpier_file(
+            file_path, stream=stream, encoding=encoding, cache=cache, stats=stats, classifier=classifier,
+            diagnostics=diagnostics)
+        extra_sheets = None
+        if combinations is not False:
+            extra_sheets = combination_tables(df_dict, combinations, stats)
+        output = save_to_excel(named, *frames, output_dir=output_dir, engine=engine, stats=stats,
+                               extra_sheets=extra_sheets)
+        return output, len(df_dict), df_dict
     
-    loadnameindex = text.find("Loadcase ID:")
-    print(f"First loadcase found at index: {loadnameindex}")
+    df = process_rcpier_file(file_path, stream=stream, encoding=encoding, cache=cache, stats=stats,
+                             layout="long", classifier=classifier, diagnostics=diagnostics)
+    output = save_table(named, df, fmt, output_dir=output_dir, stats=stats)
+    if combinations is not False:
+        for name, table in combination_tables(df, combinations, stats).items():
+            save_table(named, table, fmt, output_dir=output_dir, stats=stats,
+                       suffix="_" + name.lower())
+    return output, df['load_case'].nunique(), None
+
+
+def collect_report_paths(patterns):
+    """
+    Expand files, directories and glob patterns into report paths.
     
-    while loadnameindex != -1:
-        if text[loadnameindex+13] != "W":
-            name = text[loadnameindex+13:loadnameindex + 17]
+    Directories contribute the .txt files directly inside them. Duplicates
+    are dropped and the order of first appearance is kept.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "*.txt")))
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
         else:
-            name = text[loadnameindex+13:loadnameindex + 45]
-            name = name.replace("    Name: ", "-")
-            name = name.replace("\n", "")
-        
-        y = text.find(endp)
-        
-        # Convert to dframe
-        data = text[text.find(startp)+len(startp):y]
-        df = convSPtoDF(data, name)
-        
-        # Delete the dframe when there is 5th column
-        if df.shape[1] >= 5:
-            # Get the name of the 5th column (index 4, since counting starts from 0)
-            col_to_delete = df.columns[4]
-            # Drop the column
-            df.drop(columns=[col_to_delete], inplace=True)
-        
-        # Add header
-        if df.shape[1] >= 4:
-            df.columns = ['Line#', 'Bearing#', 'Direction', 'Loads-Kips']
-            
-            # Insert Column
-            df.insert(0, name, [None] * len(df))
-            
-            # Put dframe into dictionary
-            df_dict[name] = df
-            
-            # Categorize by load type
-            if "DC" in name:
-                dframedc = pd.concat([dframedc, df], axis=1)
-            elif "WS" in name:
-                dframews = pd.concat([dframews, df], axis=1)
-            elif "BR" in name:
-                dframebr = pd.concat([dframebr, df], axis=1)
-            elif "WL" in name:
-                dframewl = pd.concat([dframewl, df], axis=1)
-            else:
-                dframell = pd.concat([dframell, df], axis=1)
-        
-        l = len(endp)
-        text = text[y+l:]
-        loadnameindex = text.find("Loadcase ID:")
-        i += 1
+            matches = [pattern]
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def named_path(file_path, output_name=None):
+    """Report path the output names derive from: file_path renamed to output_name"""
+    if output_name is None:
+        return file_path
+    return os.path.join(os.path.dirname(file_path), output_name)
+
+
+def profile_path(file_path, output_dir=None):
+    """Path of the cProfile dump of a report: next to its workbook, as .prof"""
+    path = os.path.splitext(file_path)[0] + ".prof"
+    if output_dir is not None:
+        path = os.path.join(output_dir, os.path.basename(path))
+    return path
+
+
+def diagnostics_path(file_path, output_dir=None):
+    """Path of the diagnostics of a report: next to its workbook, as .diagnostics.json"""
+    path = os.path.splitext(file_path)[0] + ".diagnostics.json"
+    if output_dir is not None:
+        path = os.path.join(output_dir, os.path.basename(path))
+    return path
+
+
+def convert_file(file_path, output_dir=None, stream=False, encoding=None, engine="auto",
+                 cache_dir=None, profile=False, fmt="xlsx", combinations=False, keep_cases=False,
+                 classifier=None, write_diagnostics=False, output_name=None):
+    """
+    Convert one report to Excel, isolating any failure.
     
-    print(f"Processed {len(df_dict)} load cases")
-    print(f"Load case names: {list(df_dict.keys())}")
+    Runs in a batch worker process. The per-file console output is
+    suppressed; the outcome is returned instead. Parse results are cached
+    in cache_dir unless it is False. With profile, the conversion runs
+    under cProfile and the stats are dumped next to the workbook. With
+    keep_cases, the compact load case table is returned for a project
+    workbook. With write_diagnostics, the parse diagnostics are saved as
+    JSON next to the workbook. output_name renames every output of the
+    report, see convert_report().
     
-    return df_dict, dframedc, dframell, dframebr, dframews, dframewl
+    Returns:
+        dict: path, output, load_cases, bytes, seconds, stats (see
+        PipelineStats.to_dict()), diagnostics (see
+        ParseDiagnostics.to_dict()), cases (None unless kept) and error
+        (None on success)
+    """
+    start = time.perf_counter()
+    result = {"path": file_path, "output": None, "load_cases": 0, "bytes": 0, "seconds": 0.0,
+              "stats": None, "diagnostics": None, "cases": None, "error": None}
+    stats = PipelineStats()
+    diagnostics = ParseDiagnostics()
+    named = named_path(file_path, output_name)
+    try:
+        result["bytes"] = os.path.getsize(file_path)
+        cache = None if cache_dir is False else ResultCache(cache_dir)
+        profiler = profile_to(profile_path(named, output_dir)) if profile else contextlib.nullcontext()
+        with contextlib.redirect_stdout(io.StringIO()), profiler:
+            result["output"], result["load_cases"], cases = convert_report(
+                file_path, output_dir=output_dir, stream=stream, encoding=encoding, engine=engine,
+                cache=cache, stats=stats, fmt=fmt, combinations=combinations, classifier=classifier,
+                diagnostics=diagnostics, output_name=output_name)
+        if keep_cases:
+            result["cases"] = cases
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    # Also written for a failed report, the diagnostics may explain why
+    if write_diagnostics:
+        try:
+            diagnostics.to_json(diagnostics_path(named, output_dir))
+        except OSError as e:
+            result["error"] = result["error"] or f"{type(e).__name__}: {e}"
+    result["stats"] = stats.to_dict()
+    result["diagnostics"] = diagnostics.to_dict()
+    result["seconds"] = time.perf_counter() - start
+    return result
 
 
-def save_to_excel(file_path, dframedc, dframell, dframebr, dframews, dframewl):
-    """Save dataframes to Excel file"""
-    excelfilename = file_path.replace(".txt", ".xlsx")
+def run_batch(paths, workers=None, output_dir=None, stream=False, encoding=None, engine="auto",
+              cache_dir=None, profile=False, fmt="xlsx", combinations=False, project=None,
+              classifier=None, write_diagnostics=False):
+    """
+    Convert many reports in parallel across a process pool.
     
-    with pd.ExcelWriter(excelfilename, engine='openpyxl') as writer:
-        if not dframedc.empty:
-            dframedc.to_excel(writer, sheet_name='DC', index=False)
-        if not dframell.empty:
-            dframell.to_excel(writer, sheet_name='LL', index=False)
-        if not dframebr.empty:
-            dframebr.to_excel(writer, sheet_name='BR', index=False)
-        if not dframews.empty:
-            dframews.to_excel(writer, sheet_name='WS', index=False)
-        if not dframewl.empty:
-            dframewl.to_excel(writer, sheet_name='WL', index=False)
+    Args:
+        paths: Report paths
+        workers: Number of worker processes (defaults to the CPU count)
+        output_dir: Folder for the workbooks; next to each report when None
+        stream: Use the streaming parser in every worker
+        encoding: Text encoding of the reports, detected when None
+        profile: Dump a cProfile file per report next to its workbook
+        fmt: Output format, one of OUTPUT_FORMATS
+        combinations: Factor table, None for the default one, False to skip
+        project: Path of a project workbook merging every converted report
+            (xlsx format only), see project_workbook
+        classifier: LoadCaseClassifier routing the load cases, the default
+            when None
+        write_diagnostics: Save each report's parse diagnostics as JSON
+            next to its workbook
     
-    print(f"Excel file saved as: {excelfilename}")
-    return excelfilename
+    Reports of the same file name from different folders are numbered
+    ("P1.txt", "P1 (2).txt") in the names of their outputs in output_dir
+    and of their piers in the project workbook, so none replaces another.
+    
+    Returns:
+        list: convert_file() results in completion order
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from project_workbook import pier_name, unique_names, write_project_workbook
+    
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    names = dict(zip(paths, unique_names([os.path.basename(path) for path in paths])))
+    
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for path in paths:
+            # Only renamed where the outputs of several reports share a folder
+            renamed = output_dir is not None and names[path] != os.path.basename(path)
+            futures.append(executor.submit(convert_file, path, output_dir, stream, encoding, engine,
+                                           cache_dir, profile, fmt, combinations, project is not None,
+                                           classifier, write_diagnostics,
+                                           names[path] if renamed else None))
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print_result(result)
+    
+    if project is not None:
+        # Piers in the order the reports were given, not completion order
+        order = {path: i for i, path in enumerate(paths)}
+        converted = sorted((r for r in results if r["error"] is None), key=lambda r: order[r["path"]])
+        if converted:
+            piers = [pier_name(names[r["path"]]) for r in converted]
+            write_project_workbook(project, dict(zip(piers, (r["cases"] for r in converted))),
+                                   engine=engine)
+            print(f"Project workbook saved as: {project} ({len(converted)} piers)")
+    
+    print_batch_summary(results, time.perf_counter() - start)
+    return results
 
 
-if __name__ == "__main__":
-    # Command line usage
-    if len(sys.argv) > 1:
-        file_path = sys.argv[1]
+def print_result(result):
+    """Print the one-line outcome of a convert_file() result"""
+    if result["error"] is None:
+        print(f"[ok]     {result['path']} -> {result['output']} "
+              f"({result['load_cases']} load cases, {result['seconds']:.2f} s)")
+    else:
+        print(f"[failed] {result['path']}: {result['error']}")
+
+
+def print_batch_summary(results, elapsed):
+    """Print the throughput summary of a batch run"""
+    converted = [r for r in results if r["error"] is None]
+    failed = [r for r in results if r["error"] is not None]
+    total_mb = sum(r["bytes"] for r in results) / 1e6
+    
+    print("\nBatch summary")
+    print(f"  Files: {len(results)} ({len(converted)} converted, {len(failed)} failed)")
+    print(f"  Wall time: {elapsed:.2f} s")
+    if elapsed > 0:
+        print(f"  Throughput: {len(results) / elapsed:.2f} files/s, {total_mb / elapsed:.2f} MB/s")
+    
+    print("  Per-file timings:")
+    for r in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        status = "ok" if r["error"] is None else "failed"
+        print(f"    {r['seconds']:8.2f} s  {r['bytes'] / 1e6:8.2f} MB  {status:<6}  {r['path']}")
+    
+    # Where the time went, summed over the worker processes
+    stage_totals = {}
+    for r in results:
+        for stage, seconds in (r["stats"] or {}).get("stages", {}).items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+    if stage_totals:
+        total = sum(stage_totals.values())
+        print("  Stage totals (summed over all workers):")
+        for stage, seconds in stage_totals.items():
+            print(f"    {stage:<10} {seconds:8.2f} s  {seconds / total:6.1%}")
+    
+    # Parse issues per report, most errors first
+    checked = [r for r in results if r["diagnostics"] is not None]
+    if checked:
+        print("  Validation:")
+        for r in sorted(checked, key=lambda r: (-r["diagnostics"]["errors"], -r["diagnostics"]["warnings"])):
+            diag = r["diagnostics"]
+            top = sorted(diag["issue_counts"].items(), key=lambda item: item[1], reverse=True)[:3]
+            issues = ", ".join(f"{kind} x{count}" for kind, count in top) or "clean"
+            print(f"    {diag['errors']:5d} errors  {diag['warnings']:5d} warnings  {r['path']}: {issues}")
+    
+    for r in failed:
+        print(f"  Failed: {r['path']}: {r['error']}")
+
+
+def inspect_report(file_path, stream=False, encoding=None, classifier=None):
+    """
+    Parse a report without writing any output, e.g. to validate it.
+    
+    Returns:
+        rcpier_parser.ParseResult, with the load cases, the timings and
+        the diagnostics of the report
+    """
+    from rcpier_parser import parse_report
+    
+    return parse_report(file_path, encoding=encoding, stream=stream, classifier=classifier)
+
+
+# Commands of the command line; without one, the arguments are those of convert
+COMMANDS = ("convert", "batch", "inspect", "watch")
+
+
+def build_parser():
+    """Argument parser of the command line, one subparser per command"""
+    parse_options = argparse.ArgumentParser(add_help=False)
+    parse_options.add_argument("--stream", action="store_true",
+                               help="read the report chunk by chunk to bound memory use")
+    parse_options.add_argument("--encoding", default=None,
+                               help="text encoding of the report (detected when omitted)")
+    parse_options.add_argument("--rules", default=None, metavar="RULES.json",
+                               help="load case classification rules (JSON, or YAML with PyYAML); "
+                                    "default: $RCPIER_RULES or the built-in rules")
+    
+    output_options = argparse.ArgumentParser(add_help=False)
+    output_options.add_argument("--output-dir", default=None,
+                                help="folder for the Excel files (default: next to each report)")
+    output_options.add_argument("--format", choices=OUTPUT_FORMATS, default="xlsx",
+                                help="xlsx for the wide workbook, or a long table as parquet, feather or csv")
+    output_options.add_argument("--combinations", nargs="?", const="default", default=None,
+                                metavar="FACTORS.json",
+                                help="add factored load combinations and their envelope, with the factor "
+                                     "table from a JSON file or the built-in AASHTO table when no file "
+                                     "is given")
+    output_options.add_argument("--excel-engine", choices=EXCEL_ENGINES, default="auto",
+                                help="Excel writer backend (default: xlsxwriter, else openpyxl)")
+    output_options.add_argument("--no-cache", action="store_true",
+                                help="always parse the reports instead of reusing cached results")
+    output_options.add_argument("--cache-dir", default=None,
+                                help=f"parse result cache folder (default: {DEFAULT_CACHE_DIR})")
+    output_options.add_argument("--diagnostics", action="store_true",
+                                help="write the parse issues (offsets, snippets) to a .diagnostics.json "
+                                     "file next to each workbook")
+    output_options.add_argument("--workers", type=int, default=None,
+                                help="worker processes for several reports (default: CPU count)")
+    
+    batch_options = argparse.ArgumentParser(add_help=False)
+    batch_options.add_argument("--project", default=None, metavar="PROJECT.xlsx",
+                               help="also merge every report into one project workbook, one row-wise "
+                                    "sheet per category with a pier (report file name) column")
+    batch_options.add_argument("--profile", action="store_true",
+                               help="run under cProfile and write a .prof file next to each workbook")
+    
+    parser = argparse.ArgumentParser(
+        description="Extract RCPier bearing loads to Excel",
+        epilog="Without a command, the arguments are those of 'convert', e.g. "
+               "'extract_loads_rcpier.py report.txt'.")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    
+    convert = commands.add_parser(
+        "convert", parents=[parse_options, output_options, batch_options],
+        help="convert reports (the default command)",
+        description="Convert RCPier reports. Several reports, directories or glob patterns are "
+                    "converted as a batch; no report asks for one.")
+    convert.add_argument("paths", nargs="*",
+                         help="RCPier text reports, directories or glob patterns")
+    
+    batch = commands.add_parser(
+        "batch", parents=[parse_options, output_options, batch_options],
+        help="convert reports in parallel and print a summary",
+        description="Convert RCPier reports in parallel, isolating failures, and print a "
+                    "throughput and validation summary.")
+    batch.add_argument("paths", nargs="+",
+                       help="RCPier text reports, directories or glob patterns")
+    
+    inspect = commands.add_parser(
+        "inspect", parents=[parse_options],
+        help="parse a report and print its load cases and parse issues",
+        description="Parse an RCPier report without writing any output and print its load "
+                    "cases, timings and parse issues. Exits with status 1 when the report has "
+                    "parse errors.")
+    inspect.add_argument("path", help="RCPier text report")
+    inspect.add_argument("--json", action="store_true",
+                         help="print only the diagnostics, as JSON")
+    
+    watch = commands.add_parser(
+        "watch", parents=[parse_options, output_options],
+        help="convert the reports of a folder whenever they are written or changed",
+        description="Keep running and convert the reports of a folder whenever they are "
+                    "written or changed, until interrupted.")
+    watch.add_argument("folder", help="folder of RCPier text reports")
+    watch.add_argument("--poll-interval", type=float, default=0.25, metavar="SECONDS",
+                       help="seconds between two scans of the folder (default: 0.25)")
+    watch.add_argument("--settle", type=float, default=0.5, metavar="SECONDS",
+                       help="seconds a report must stay unchanged before it is converted, "
+                            "so partially written reports are skipped (default: 0.5)")
+    return parser
+
+
+def _classifier_option(args):
+    """Classifier of --rules, None for the default; exits on an invalid file"""
+    if args.rules is None:
+        return None
+    try:
+        return load_rules(args.rules)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Error: Invalid rule file '{args.rules}': {e}")
+        sys.exit(1)
+
+
+def _combinations_option(args):
+    """Factor table of --combinations for convert_report(); exits on an invalid file"""
+    if args.combinations is None:
+        return False
+    if args.combinations == "default":
+        return None
+    from load_combinations import load_factor_table
+    
+    try:
+        return load_factor_table(args.combinations)
+    except (OSError, ValueError) as e:
+        print(f"Error: Invalid factor table '{args.combinations}': {e}")
+        sys.exit(1)
+
+
+def _batch_command(args):
+    if args.project is not None and args.format != "xlsx":
+        print("Error: --project requires the xlsx format!")
+        return 1
+    paths = collect_report_paths(args.paths)
+    if not paths:
+        print("Error: No report files found!")
+        return 1
+    results = run_batch(paths, workers=args.workers, output_dir=args.output_dir,
+                        stream=args.stream, encoding=args.encoding, engine=args.excel_engine,
+                        cache_dir=False if args.no_cache else args.cache_dir, profile=args.profile,
+                        fmt=args.format, combinations=_combinations_option(args), project=args.project,
+                        classifier=_classifier_option(args), write_diagnostics=args.diagnostics)
+    return 1 if any(r["error"] is not None for r in results) else 0
+
+
+def _convert_command(args):
+    # Batch mode for directories, globs, several files or a project workbook
+    if (len(args.paths) > 1 or args.project is not None
+            or any(os.path.isdir(p) or glob.has_magic(p) for p in args.paths)):
+        return _batch_command(args)
+    
+    if args.paths:
+        file_path = args.paths[0]
     else:
         # Interactive mode - ask for file path
         file_path = input("Enter the path to the text file: ").strip()
     
     if not os.path.exists(file_path):
         print(f"Error: File '{file_path}' not found!")
-        sys.exit(1)
+        return 1
+    combinations = _combinations_option(args)
+    classifier = _classifier_option(args)
     
     # Process the file
-    df_dict, dframedc, dframell, dframebr, dframews, dframewl = process_rcpier_file(file_path)
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    stats = PipelineStats()
+    diagnostics = ParseDiagnostics()
+    prof_file = profile_path(file_path, args.output_dir)
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    profiler = profile_to(prof_file) if args.profile else contextlib.nullcontext()
+    # Tracing allocations slows the run down, so only when profiling
+    memory = stats.track_memory() if args.profile else contextlib.nullcontext()
+    try:
+        with profiler, memory:
+            output_file, _, _ = convert_report(file_path, output_dir=args.output_dir, stream=args.stream,
+                                               encoding=args.encoding, engine=args.excel_engine,
+                                               cache=cache, stats=stats, fmt=args.format,
+                                               combinations=combinations, classifier=classifier,
+                                               diagnostics=diagnostics)
+    except ValueError as e:
+        # e.g. a report without load cases, or one that does not decode
+        print(f"Error: {e}")
+        output_file = None
+    
+    if output_file is not None:
+        print("\nProcessing complete!")
+        print(f"Output file: {output_file}")
+        print(stats.summary())
+    # Also written for a failed report, the diagnostics may explain why
+    if args.diagnostics:
+        diag_file = diagnostics_path(file_path, args.output_dir)
+        diagnostics.to_json(diag_file)
+        print(f"Diagnostics saved as: {diag_file}")
+    if output_file is None:
+        return 1
     
-    # Save to Excel
-    excel_file = save_to_excel(file_path, dframedc, dframell, dframebr, dframews, dframewl)
+    if args.profile:
+        import pstats
+        
+        print(f"\nProfile saved as: {prof_file}")
+        pstats.Stats(prof_file).sort_stats("cumulative").print_stats(15)
+    return 0
+
+
+def _inspect_command(args):
+    if not os.path.exists(args.path):
+        print(f"Error: File '{args.path}' not found!")
+        return 1
+    result = inspect_report(args.path, stream=args.stream, encoding=args.encoding,
+                            classifier=_classifier_option(args))
+    diagnostics = result.diagnostics
+    if args.json:
+        print(diagnostics.to_json())
+    else:
+        counts = result.df_dict.case_counts()
+        print(f"Report: {args.path}")
+        print(f"Encoding: {result.encoding}")
+        print(f"Load cases: {len(result.df_dict)} ("
+              + ", ".join(f"{category}={counts[category]}" for category in CATEGORIES) + ")")
+        print(diagnostics.summary())
+        print(result.stats.summary())
+    return 1 if diagnostics.errors else 0
+
+
+def _watch_command(args):
+    if not os.path.isdir(args.folder):
+        print(f"Error: Folder '{args.folder}' not found!")
+        return 1
+    # Imported here, it imports this module in turn
+    from watch_folder import watch
+    
+    watch(args.folder, workers=args.workers, poll_interval=args.poll_interval, settle=args.settle,
+          output_dir=args.output_dir, stream=args.stream, encoding=args.encoding,
+          engine=args.excel_engine, cache_dir=False if args.no_cache else args.cache_dir,
+          fmt=args.format, combinations=_combinations_option(args),
+          classifier=_classifier_option(args), write_diagnostics=args.diagnostics)
+    return 0
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    
+    Args:
+        argv: Arguments without the program name, sys.argv[1:] when None
     
-    print("\nProcessing complete!")
-    print(f"Output file: {excel_file}")
+    Returns:
+        int: Exit status
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Command lines without a command (the original interface) convert
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv = ["convert"] + argv
+    args = build_parser().parse_args(argv)
+    handlers = {"convert": _convert_command, "batch": _batch_command,
+                "inspect": _inspect_command, "watch": _watch_command}
+    return handlers[args.command](args)
 
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Load case classification: which sheet a load case goes to.
+
+A rule table maps regular expressions to load categories. The rules are
+compiled once into a single anchored alternation in which every rule is
+a lookahead, so one match call finds the first rule (in table order)
+that matches anywhere in the name. Results are cached per name, and the
+sheet routing, the counters and the long table all read the same
+classifier, so the CLI and the app always agree.
+
+A rule file is JSON, or YAML when PyYAML is installed:
+
+    {"default": "LL",
+     "rules": [{"category": "DC", "pattern": "DC"}, ...]}
+
+The RCPIER_RULES environment variable points both front ends at a rule
+file; the built-in rules are used when it is not set.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import re
+
+
+# Load categories in sheet order
+CATEGORIES = ["DC", "LL", "BR", "WS", "WL", "CE"]
+
+# Built-in rules, first match wins; LL takes every case no rule claims
+DEFAULT_RULES = [
+    {"category": "DC", "pattern": "DC"},
+    {"category": "WS", "pattern": "WS"},
+    {"category": "BR", "pattern": "BR"},
+    {"category": "WL", "pattern": "WL"},
+    {"category": "CE", "pattern": "CE"},
+]
+DEFAULT_CATEGORY = "LL"
+
+# Rule file used by default_classifier()
+RULES_PATH = os.environ.get("RCPIER_RULES")
+
+# Distinct names remembered per classifier
+CACHE_SIZE = 1 << 16
+
+
+def check_rules(rules, default=DEFAULT_CATEGORY):
+    """Validate a rule table and return it; raises ValueError on errors"""
+    if not isinstance(rules, list):
+        raise ValueError("The rules must be a list of {category, pattern} entries")
+    if default not in CATEGORIES:
+        raise ValueError(f"Unknown default category '{default}', expected one of {CATEGORIES}")
+    for i, rule in enumerate(rules, 1):
+        if not isinstance(rule, dict) or set(rule) != {"category", "pattern"}:
+            raise ValueError(f"Rule {i} must have exactly a category and a pattern")
+        if rule["category"] not in CATEGORIES:
+            raise ValueError(f"Rule {i} uses unknown category '{rule['category']}', "
+                             f"expected one of {CATEGORIES}")
+        try:
+            re.compile(rule["pattern"])
+        except (re.error, TypeError) as e:
+            raise ValueError(f"Rule {i} has an invalid pattern {rule['pattern']!r}: {e}") from e
+    return rules
+
+
+class LoadCaseClassifier:
+    """
+    Classify load case names by a rule table.
+    
+    Args:
+        rules: List of {"category", "pattern"} dicts, first match wins
+        default: Category of names no rule matches
+    """
+    
+    def __init__(self, rules=DEFAULT_RULES, default=DEFAULT_CATEGORY):
+        self.rules = check_rules(rules, default)
+        self.default = default
+        # Rule i becomes the empty group r<i> around a lookahead; the first
+        # alternative whose lookahead succeeds at the start is the match
+        self.pattern = re.compile("|".join(
+            f"(?P<r{i}>(?=.*?(?:{rule['pattern']})))" for i, rule in enumerate(rules)), re.S)
+        self._categories = {f"r{i}": rule["category"] for i, rule in enumerate(rules)}
+        self.classify = functools.lru_cache(maxsize=CACHE_SIZE)(self._classify)
+    
+    def __reduce__(self):
+        # The cache does not pickle; workers rebuild it from the rules
+        return (LoadCaseClassifier, (self.rules, self.default))
+    
+    def _classify(self, name):
+        match = self.pattern.match(name) if self.rules else None
+        if match is None:
+            return self.default
+        return self._categories[match.lastgroup]
+    
+    @property
+    def key(self):
+        """Digest of the rules, for cache keys of results they produced"""
+        text = json.dumps([self.rules, self.default], sort_keys=True)
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def load_rules(path):
+    """
+    Read a classifier from a JSON or YAML rule file.
+    
+    Returns:
+        LoadCaseClassifier
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError(f"YAML rule files need PyYAML (pip install pyyaml): {e}") from e
+            try:
+                config = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML: {e}") from e
+        else:
+            config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError("The rule file must hold a mapping with a 'rules' list")
+    return LoadCaseClassifier(config.get("rules", []), config.get("default", DEFAULT_CATEGORY))
+
+
+@functools.lru_cache(maxsize=None)
+def default_classifier():
+    """Classifier of the RCPIER_RULES file, or of the built-in rules"""
+    if RULES_PATH:
+        return load_rules(RULES_PATH)
+    return LoadCaseClassifier()
@@ -0,0 +1,256 @@
+"""
+Vectorized load combinations over extracted bearing loads.
+
+The loads are arranged as one (load case x line/bearing/direction) matrix.
+Every category is reduced once: permanent categories (DC) are summed,
+transient ones are enveloped, keeping the case that gives the largest
+and the smallest load at each bearing and direction. The factored
+combinations are then evaluated for all points at once with NumPy
+broadcasting, so thousands of load cases and dozens of combinations take
+milliseconds.
+
+A factor table maps combination name -> {category: factor}. A factor is
+a number, or a [max, min] pair for permanent loads, whichever governs is
+used (e.g. DC 1.25/0.90 in the strength limit states).
+
+A transient load case may list the same bearing and direction more than
+once: every live load table of RCPier repeats its grid with an "L" flag
+(dropped by the parser), with loads close to those of the plain rows.
+Such repeats are taken as alternative results of the case, not as loads
+acting together: each repeat is enveloped like a case of its own, so the
+live load is never doubled. Repeats within a summed (permanent) case are
+added, like any other rows of that case.
+"""
+
+import json
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from rcpier_parser import CATEGORIES, to_long
+
+
+# AASHTO LRFD Table 3.4.1-1 factors for the categories RCPier reports;
+# check them against the edition and owner requirements of the project
+DEFAULT_COMBINATIONS = {
+    "Strength I": {"DC": [1.25, 0.90], "LL": 1.75, "BR": 1.75, "CE": 1.75},
+    "Strength III": {"DC": [1.25, 0.90], "WS": 1.0},
+    "Strength V": {"DC": [1.25, 0.90], "LL": 1.35, "BR": 1.35, "CE": 1.35, "WS": 1.0, "WL": 1.0},
+    "Service I": {"DC": 1.0, "LL": 1.0, "BR": 1.0, "CE": 1.0, "WS": 1.0, "WL": 1.0},
+}
+
+# Categories whose load cases act together; all others are alternatives
+SUMMED_CATEGORIES = ("DC",)
+
+POINT_COLUMNS = ['line', 'bearing', 'direction']
+
+
+def load_factor_table(path):
+    """
+    Read a factor table from a JSON file.
+    
+    The file holds {"combination name": {"category": factor or [max, min]}}.
+    """
+    with open(path) as f:
+        return check_factor_table(json.load(f))
+
+
+def check_factor_table(combinations):
+    """Validate a factor table and return it; raises ValueError on errors"""
+    if not isinstance(combinations, dict):
+        raise ValueError("The factor table must map combination names to factors")
+    for name, factors in combinations.items():
+        if not isinstance(factors, dict):
+            raise ValueError(f"Combination '{name}' must map categories to factors")
+        unknown = set(factors) - set(CATEGORIES)
+        if unknown:
+            raise ValueError(f"Combination '{name}' uses unknown categories {sorted(unknown)}, "
+                             f"expected some of {CATEGORIES}")
+        for category, factor in factors.items():
+            pair = isinstance(factor, (list, tuple))
+            values = factor if pair else [factor]
+            if (pair and len(factor) != 2) or not all(isinstance(v, (int, float)) for v in values):
+                raise ValueError(f"Factor of {category} in '{name}' must be a number or a [max, min] pair")
+    return combinations
+
+
+def _factor_matrices(combinations, categories):
+    """(max, min) factor matrices of shape (combinations, categories)"""
+    high = np.zeros((len(combinations), len(categories)))
+    low = np.zeros_like(high)
+    for k, factors in enumerate(combinations.values()):
+        for c, category in enumerate(categories):
+            factor = factors.get(category, 0.0)
+            if isinstance(factor, (list, tuple)):
+                high[k, c], low[k, c] = factor
+            else:
+                high[k, c] = low[k, c] = factor
+    return high, low
+
+
+def _load_matrix(long, summed=SUMMED_CATEGORIES):
+    """
+    Arrange a long load table as a (load case variant x point) matrix.
+    
+    The n-th row of a transient case for a point goes into the n-th
+    variant of the case (see the module docstring); a summed case has a
+    single variant adding all its rows.
+    
+    Returns:
+        tuple: (matrix, case name and category of every variant, points frame)
+    """
+    groups = long.groupby(POINT_COLUMNS, observed=True, sort=True)
+    # NaN for a row whose line or bearing is not a number
+    points = groups.ngroup().to_numpy(dtype=np.float64)
+    point_index = groups.size().index.to_frame(index=False)
+    
+    case_codes, case_names = pd.factorize(long['load_case'], sort=False)
+    first_rows = np.unique(case_codes, return_index=True)[1]
+    case_categories = long['category'].to_numpy()[first_rows]
+    
+    repeats = pd.DataFrame({'case': case_codes, 'point': points}).groupby(
+        ['case', 'point'], sort=False, dropna=False).cumcount().to_numpy(copy=True)
+    repeats[np.isin(case_categories[case_codes], summed)] = 0
+    variant_codes, variants = pd.factorize(pd.MultiIndex.from_arrays([case_codes, repeats]), sort=True)
+    variant_cases = variants.get_level_values(0).to_numpy()
+    
+    matrix = np.zeros((len(variants), len(point_index)))
+    # A load case without a row for a point contributes nothing there, nor
+    # does a load that is not a number (e.g. 'N/A') or a row without a point
+    loads = pd.to_numeric(long['load_kips'], errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(points) & ~np.isnan(loads)
+    np.add.at(matrix, (variant_codes[valid], points[valid].astype(np.intp)), loads[valid])
+    
+    return (matrix, np.asarray(case_names, dtype=object)[variant_cases],
+            np.asarray(case_categories, dtype=object)[variant_cases], point_index)
+
+
+def _category_envelopes(matrix, case_names, case_categories, categories, summed):
+    """
+    Reduce the load matrix to per-category extremes.
+    
+    Returns:
+        tuple: (highest, lowest) values of shape (categories, points) and
+        the names of the cases producing them (None where no case governs)
+    """
+    n_points = matrix.shape[1]
+    highest = np.zeros((len(categories), n_points))
+    lowest = np.zeros_like(highest)
+    high_cases = np.full((len(categories), n_points), None, dtype=object)
+    low_cases = np.full_like(high_cases, None)
+    
+    for c, category in enumerate(categories):
+        rows = np.flatnonzero(case_categories == category)
+        if not len(rows):
+            continue
+        loads = matrix[rows]
+        if category in summed:
+            highest[c] = lowest[c] = loads.sum(axis=0)
+            high_cases[c] = low_cases[c] = category
+            continue
+        # Transient loads are only applied where they increase the effect
+        high_idx = loads.argmax(axis=0)
+        low_idx = loads.argmin(axis=0)
+        highest[c] = np.maximum(loads[high_idx, np.arange(n_points)], 0.0)
+        lowest[c] = np.minimum(loads[low_idx, np.arange(n_points)], 0.0)
+        high_cases[c] = np.where(highest[c] > 0, case_names[rows][high_idx], None)
+        low_cases[c] = np.where(lowest[c] < 0, case_names[rows][low_idx], None)
+    return highest, lowest, high_cases, low_cases
+
+
+def _governing_cases(chosen):
+    """Join the governing case names of every (combination, point) entry"""
+    return np.array([" + ".join(name for name in names if name is not None)
+                     for names in chosen.reshape(-1, chosen.shape[-1])],
+                    dtype=object).reshape(chosen.shape[:-1])
+
+
+def combine_loads(data, combinations=None, summed=SUMMED_CATEGORIES):
+    """
+    Evaluate factored load combinations at every bearing and direction.
+    
+    Args:
+        data: Long load table (rcpier_parser.LONG_COLUMNS), or the df_dict
+            of a parse (a LoadCaseTable or a dict of wide blocks)
+        combinations: Factor table, DEFAULT_COMBINATIONS when None
+        summed: Categories whose cases are added instead of enveloped
+    
+    Returns:
+        DataFrame: One row per combination and point with the max and min
+        factored load and the load cases producing each
+    """
+    long = to_long(data) if isinstance(data, Mapping) else data
+    combinations = combinations if combinations is not None else DEFAULT_COMBINATIONS
+    columns = ['combination'] + POINT_COLUMNS + ['max_kips', 'max_cases', 'min_kips', 'min_cases']
+    if long.empty or not combinations:
+        return pd.DataFrame(columns=columns)
+    
+    matrix, case_names, case_categories, point_index = _load_matrix(long, summed)
+    categories = [category for category in CATEGORIES if category in set(case_categories)]
+    highest, lowest, high_cases, low_cases = _category_envelopes(
+        matrix, case_names, case_categories, categories, summed)
+    factor_high, factor_low = _factor_matrices(combinations, categories)
+    
+    # Candidates of shape (combination, category, point): each factor of a
+    # [max, min] pair applied to the highest and to the lowest category load
+    candidates = np.stack([
+        factor_high[:, :, None] * highest,
+        factor_high[:, :, None] * lowest,
+        factor_low[:, :, None] * highest,
+        factor_low[:, :, None] * lowest,
+    ])
+    max_choice = candidates.argmax(axis=0)
+    min_choice = candidates.argmin(axis=0)
+    max_loads = np.take_along_axis(candidates, max_choice[None], axis=0)[0].sum(axis=1)
+    min_loads = np.take_along_axis(candidates, min_choice[None], axis=0)[0].sum(axis=1)
+    
+    # Even candidates use the highest load, odd ones the lowest; categories
+    # with a zero factor do not govern
+    used = (factor_high != 0)[:, :, None] | (factor_low != 0)[:, :, None]
+    max_cases = np.where(max_choice % 2 == 0, high_cases[None], low_cases[None])
+    min_cases = np.where(min_choice % 2 == 0, high_cases[None], low_cases[None])
+    max_cases = _governing_cases(np.where(used, max_cases, None).transpose(0, 2, 1))
+    min_cases = _governing_cases(np.where(used, min_cases, None).transpose(0, 2, 1))
+    
+    n_combinations, n_points = max_loads.shape
+    result = pd.DataFrame({
+        'combination': pd.Categorical.from_codes(np.repeat(np.arange(n_combinations), n_points),
+                                                 categories=list(combinations)),
+    })
+    for column in POINT_COLUMNS:
+        result[column] = np.tile(point_index[column].to_numpy(), n_combinations)
+    result['max_kips'] = max_loads.ravel()
+    result['max_cases'] = max_cases.ravel()
+    result['min_kips'] = min_loads.ravel()
+    result['min_cases'] = min_cases.ravel()
+    return result
+
+
+def envelope(results):
+    """
+    Governing max and min over all combinations at every point.
+    
+    Args:
+        results: Output of combine_loads()
+    
+    Returns:
+        DataFrame: One row per point with the max and min factored load,
+        the combination and the load cases controlling each
+    """
+    columns = POINT_COLUMNS + ['max_kips', 'max_combination', 'max_cases',
+                               'min_kips', 'min_combination', 'min_cases']
+    if results.empty:
+        return pd.DataFrame(columns=columns)
+    groups = results.groupby(POINT_COLUMNS, observed=True, sort=True)
+    high = results.loc[groups['max_kips'].idxmax()].reset_index(drop=True)
+    low = results.loc[groups['min_kips'].idxmin()].reset_index(drop=True)
+    return pd.DataFrame({
+        **{column: high[column] for column in POINT_COLUMNS},
+        'max_kips': high['max_kips'],
+        'max_combination': high['combination'],
+        'max_cases': high['max_cases'],
+        'min_kips': low['min_kips'],
+        'min_combination': low['combination'],
+        'min_cases': low['min_cases'],
+    })[columns]
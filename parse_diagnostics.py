@@ -0,0 +1,119 @@
+"""
+Diagnostics of a report parse.
+
+The parser records every problem it meets during its single pass over
+the report: load cases without a bearing load table or separator line,
+empty or malformed tables and tables only the fallback tokenizer could
+read, each with its offset in the report and a snippet of the text. A
+failed parse can thus be explained without scanning the report again,
+and the record can be saved as JSON next to the output.
+"""
+
+import json
+
+
+# Issue kind -> (severity, description); errors drop the load case,
+# warnings keep it
+ISSUE_KINDS = {
+    "no_load_cases": ("error", "No 'Loadcase ID:' marker in the report"),
+    "truncated_name": ("error", "Load case name runs past the end of the report"),
+    "missing_table": ("error", "No 'Bearing loads:' table"),
+    "missing_separator": ("error", "No dashed separator line below 'Bearing loads:'"),
+    "empty_table": ("error", "Empty table"),
+    "wrong_columns": ("error", "Fewer than four columns"),
+    "empty_dataframe": ("error", "No table rows"),
+    "irregular_table": ("warning", "Ragged rows or columns beyond the flag, read by the fallback tokenizer"),
+    "text_columns": ("warning", "Line, bearing or load values that are not numbers"),
+}
+
+# Issues kept with their details; further ones are only counted
+MAX_ISSUES = 200
+
+# Characters of report text kept per issue
+SNIPPET_LENGTH = 200
+
+
+class ParseDiagnostics:
+    """
+    Section markers seen and issues met while parsing one report.
+
+    Args:
+        max_issues: Issues kept with offset, load case and snippet; all
+            of them are counted
+    """
+
+    def __init__(self, max_issues=MAX_ISSUES):
+        self.markers = {"loadcase": 0, "bearing": 0, "auto": 0}
+        self.issue_counts = {}
+        self.issues = []
+        self.counters = {}
+        self.max_issues = max_issues
+
+    def add_markers(self, index):
+        """Count the markers of an index_markers() result"""
+        for kind, offsets in index.items():
+            self.markers[kind] += len(offsets)
+
+    def add(self, kind, offset, load_case=None, snippet=None, detail=None):
+        """Record an issue of one of ISSUE_KINDS at a character offset"""
+        self.issue_counts[kind] = self.issue_counts.get(kind, 0) + 1
+        if len(self.issues) < self.max_issues:
+            self.issues.append({
+                "kind": kind,
+                "severity": ISSUE_KINDS[kind][0],
+                "offset": offset,
+                "load_case": load_case,
+                "detail": detail,
+                "snippet": snippet[:SNIPPET_LENGTH] if snippet is not None else None,
+            })
+
+    def merge(self, other):
+        """Add the markers, counts and issues of another ParseDiagnostics"""
+        for kind, count in other.markers.items():
+            self.markers[kind] = self.markers.get(kind, 0) + count
+        for kind, count in other.issue_counts.items():
+            self.issue_counts[kind] = self.issue_counts.get(kind, 0) + count
+        self.issues.extend(other.issues[:max(self.max_issues - len(self.issues), 0)])
+        self.counters.update(other.counters)
+
+    def _count(self, severity):
+        return sum(count for kind, count in self.issue_counts.items()
+                   if ISSUE_KINDS[kind][0] == severity)
+
+    @property
+    def errors(self):
+        return self._count("error")
+
+    @property
+    def warnings(self):
+        return self._count("warning")
+
+    def to_dict(self):
+        """Plain dict of the diagnostics, e.g. for JSON output"""
+        return {
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "markers": dict(self.markers),
+            "issue_counts": dict(self.issue_counts),
+            "counters": dict(self.counters),
+            "issues": list(self.issues),
+        }
+
+    def to_json(self, path=None):
+        """JSON text of to_dict(), also written to path when given"""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def summary(self):
+        """Multi-line text summary of the diagnostics"""
+        lines = [f"Diagnostics: {self.errors} errors, {self.warnings} warnings"]
+        lines.append("  Markers: " + ", ".join(f"{kind}={count}" for kind, count in self.markers.items()))
+        for kind, count in self.issue_counts.items():
+            severity, description = ISSUE_KINDS[kind]
+            first = next((issue for issue in self.issues if issue["kind"] == kind), None)
+            where = f", first at offset {first['offset']} ({first['load_case']})" if first else ""
+            lines.append(f"  {severity:<7} {kind}: {count} x {description}{where}")
+        return "\n".join(lines)
@@ -0,0 +1,157 @@
+"""
+Instrumentation of the report conversion pipeline.
+
+A PipelineStats object travels with one conversion and records the wall
+time of each stage (read, decode, detect, scan, convert, assemble,
+export), the amount of data processed, the skip counters of the parser
+and optionally the peak memory, so a slow conversion can be pinned on
+the stage that causes it.
+"""
+
+import contextlib
+import cProfile
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    if sys.platform == "darwin":
+        return peak / 1e6
+    return peak / 1e3
+
+
+@contextlib.contextmanager
+def profile_to(path):
+    """Run the enclosed code under cProfile and dump the stats to path"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+class PipelineStats:
+    """
+    Per-stage wall times and counters of one report conversion.
+    
+    Stage times are exclusive: time spent in a stage nested inside another
+    (e.g. encoding detection inside decoding) is only counted once, so the
+    stages add up to the instrumented total.
+    """
+    
+    def __init__(self):
+        self.stages = {}
+        self.bytes = 0
+        self.load_cases = 0
+        self.rows = 0
+        self.counters = {}
+        self.peak_memory_mb = None
+        self._nested = []
+    
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed code as stage name (times of a name add up)"""
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested.pop()
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - nested
+            if self._nested:
+                self._nested[-1] += elapsed
+    
+    def timed(self, iterable, name):
+        """Yield from iterable, timing the production of each item as stage name"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    
+    @contextlib.contextmanager
+    def track_memory(self):
+        """Record the peak traced allocation of the enclosed code"""
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.peak_memory_mb = peak / 1e6
+    
+    @property
+    def total_seconds(self):
+        return sum(self.stages.values())
+    
+    def _rate(self, amount):
+        total = self.total_seconds
+        return amount / total if total > 0 else None
+    
+    @property
+    def load_cases_per_second(self):
+        return self._rate(self.load_cases)
+    
+    @property
+    def rows_per_second(self):
+        return self._rate(self.rows)
+    
+    @property
+    def mb_per_second(self):
+        return self._rate(self.bytes / 1e6)
+    
+    def to_dict(self):
+        """Plain dict of every measurement, e.g. for JSON output"""
+        return {
+            "stages": dict(self.stages),
+            "total_seconds": self.total_seconds,
+            "bytes": self.bytes,
+            "load_cases": self.load_cases,
+            "rows": self.rows,
+            "load_cases_per_second": self.load_cases_per_second,
+            "rows_per_second": self.rows_per_second,
+            "mb_per_second": self.mb_per_second,
+            "peak_memory_mb": self.peak_memory_mb,
+            "peak_rss_mb": peak_rss_mb(),
+            "counters": dict(self.counters),
+        }
+    
+    def summary(self):
+        """Multi-line text summary of the measurements"""
+        total = self.total_seconds
+        lines = ["Performance:"]
+        for name, seconds in self.stages.items():
+            share = seconds / total if total > 0 else 0.0
+            lines.append(f"  {name:<10} {seconds:9.4f} s  {share:6.1%}")
+        lines.append(f"  {'total':<10} {total:9.4f} s")
+        lines.append(f"  Input: {self.bytes / 1e6:.2f} MB, {self.load_cases} load cases, {self.rows} rows")
+        if total > 0:
+            lines.append(f"  Rate: {self.mb_per_second:.2f} MB/s, "
+                         f"{self.load_cases_per_second:.0f} load cases/s, {self.rows_per_second:.0f} rows/s")
+        if self.peak_memory_mb is not None:
+            lines.append(f"  Peak traced memory: {self.peak_memory_mb:.1f} MB")
+        rss = peak_rss_mb()
+        if rss is not None:
+            lines.append(f"  Peak process memory: {rss:.1f} MB")
+        skipped = {name: count for name, count in self.counters.items()
+                   if name.startswith("skipped") and count}
+        if skipped:
+            lines.append("  Skipped: " + ", ".join(f"{name}={count}" for name, count in skipped.items()))
+        return "\n".join(lines)
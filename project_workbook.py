@@ -0,0 +1,101 @@
+"""
+Project workbooks combining the reports of several piers.
+
+The load tables of every pier are stacked row-wise into one long
+DC/LL/BR/WS/WL/CE sheet per category, with a pier column, so the sheets
+grow by rows as piers are added (a side-by-side layout would multiply
+their width by the pier count and soon pass Excel's column limit). A
+bridge with dozens of pier reports becomes one workbook written in a
+single streaming pass. The reports are given as their compact load case
+tables (rcpier_parser.LoadCaseTable).
+"""
+
+import os
+
+import pandas as pd
+
+from excel_export import write_workbook
+from rcpier_parser import CATEGORIES, LONG_COLUMNS
+
+
+# Columns of a project category sheet: the pier, then the long columns
+# without the category, which the sheet name gives
+PROJECT_COLUMNS = ['pier'] + [col for col in LONG_COLUMNS if col != 'category']
+
+
+def pier_name(file_name):
+    """Pier name of a report: its file name without folder and extension"""
+    return os.path.splitext(os.path.basename(file_name))[0]
+
+
+def unique_names(names):
+    """
+    Number the repeats of names before their extension, e.g. "P1.txt",
+    "P1 (2).txt", so reports with the same file name keep apart.
+    
+    Args:
+        names: File or pier names, in order
+    
+    Returns:
+        list: The names, each one unique
+    """
+    unique = []
+    taken = set()
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        candidate = name
+        count = 1
+        while candidate in taken:
+            count += 1
+            candidate = f"{stem} ({count}){ext}"
+        taken.add(candidate)
+        unique.append(candidate)
+    return unique
+
+
+def merge_reports(reports):
+    """
+    Stack the load tables of several reports into one frame per category.
+    
+    Args:
+        reports: dict pier name -> LoadCaseTable of its report, in the
+            order the piers should appear
+    
+    Returns:
+        dict: Category -> frame with PROJECT_COLUMNS, the rows of each
+        pier together in pier order and in report order within a pier
+    """
+    tables = [cases.table.assign(pier=pier) for pier, cases in reports.items() if len(cases.table)]
+    if not tables:
+        return {category: pd.DataFrame(columns=PROJECT_COLUMNS) for category in CATEGORIES}
+    # One concat for every pier and category
+    merged = pd.concat(tables, ignore_index=True)
+    category = merged['category'].astype(str)
+    return {name: merged.loc[category == name, PROJECT_COLUMNS].reset_index(drop=True)
+            for name in CATEGORIES}
+
+
+def project_summary(reports):
+    """Load case count per pier and category"""
+    rows = []
+    for pier, cases in reports.items():
+        counts = cases.case_counts()
+        rows.append({"Pier": pier, **counts, "Total": sum(counts.values())})
+    return pd.DataFrame(rows, columns=["Pier"] + CATEGORIES + ["Total"])
+
+
+def write_project_workbook(target, reports, engine="auto"):
+    """
+    Write the stacked category sheets and a Piers summary sheet.
+    
+    Args:
+        target: Output path or binary file object (e.g. BytesIO)
+        reports: dict pier name -> LoadCaseTable, see merge_reports()
+        engine: One of excel_export.EXCEL_ENGINES
+    
+    Returns:
+        str: The backend that wrote the workbook
+    """
+    sheets = merge_reports(reports)
+    sheets["Piers"] = project_summary(reports)
+    return write_workbook(target, sheets, engine=engine)
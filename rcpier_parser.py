@@ -0,0 +1,987 @@
+"""
+Single-pass parser engine for RCPier bearing load reports.
+
+The report text is scanned once to build an offset index of the section
+markers. Each load case table is then sliced out between the recorded
+offsets instead of re-slicing the remaining text after every load case.
+The tables are stored together in one compact typed table (see
+LoadCaseTable); the wide per-case blocks are only built when asked for.
+"""
+
+import codecs
+import contextlib
+import functools
+import io
+import itertools
+import os
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+import chardet
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from load_classification import CATEGORIES, default_classifier
+from parse_diagnostics import SNIPPET_LENGTH, ParseDiagnostics
+from pipeline_stats import PipelineStats
+
+
+# Section markers of an RCPier "LOADS" report
+LOADCASE_MARKER = "Loadcase ID:"
+BEARING_MARKER = "Bearing loads:"
+AUTO_GEN_MARKER = "Auto generation details"
+END_OF_LOADS_MARKER = "Selected load groups"
+SEPARATOR_LINE = "-------------------------------------------------"
+
+# One compiled alternation finds every marker in a single pass
+MARKER_PATTERN = re.compile(
+    "(?P<loadcase>%s)|(?P<bearing>%s)|(?P<auto>%s)" % (
+        re.escape(LOADCASE_MARKER),
+        re.escape(BEARING_MARKER),
+        re.escape(AUTO_GEN_MARKER),
+    )
+)
+
+# The load case name starts after "Loadcase ID: "
+NAME_OFFSET = len(LOADCASE_MARKER) + 1
+LOAD_CASE_ID_PATTERN = re.compile(r"\S+")
+
+# data_start of a load case without a usable table, see index_load_cases()
+NO_BEARING_TABLE = -1
+NO_SEPARATOR = -2
+
+# Characters read per chunk in streaming mode
+STREAM_CHUNK_SIZE = 1 << 20
+
+# Bytes handed to chardet when a report is neither ASCII nor UTF-8
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# Detected encodings per report source (e.g. the folder an RCPier install writes to)
+_encoding_cache = {}
+
+# Column labels of a bearing load table
+TABLE_COLUMNS = ['Line#', 'Bearing#', 'Direction', 'Loads-Kips']
+
+# Columns of a load case block in the wide sheets: a name column, then the table
+BLOCK_WIDTH = len(TABLE_COLUMNS) + 1
+
+# Columns of the long (tidy) layout: one row per table line of every load case
+LONG_COLUMNS = ['load_case', 'category', 'line', 'bearing', 'direction', 'load_kips']
+
+# A well-formed table row: line, bearing, direction and load, optionally
+# followed by a flag (e.g. "L" on live load rows), which is dropped
+TABLE_ROW_PATTERN = re.compile(
+    r"^[ \t]*(\S+)[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)(?:[ \t]+\S+)?[ \t]*$", re.M)
+
+
+def trim_report(text):
+    """Return the part of the report before "Selected load groups" """
+    end = text.find(END_OF_LOADS_MARKER)
+    if end != -1:
+        return text[:end]
+    return text
+
+
+def index_markers(text):
+    """
+    Build an offset index of every section marker in the report.
+    
+    Args:
+        text: Decoded report text
+    
+    Returns:
+        dict: marker kind ('loadcase', 'bearing', 'auto') -> list of offsets
+    """
+    index = {"loadcase": [], "bearing": [], "auto": []}
+    for match in MARKER_PATTERN.finditer(text):
+        index[match.lastgroup].append(match.start())
+    return index
+
+
+def extract_load_case_name(text, loadcase_idx):
+    """
+    Read the load case name that follows a "Loadcase ID:" marker.
+    
+    Wind cases (IDs starting with "W") carry a descriptive name, which is
+    appended to the ID with a dash. The name is returned unstripped.
+    Returns None when the marker is at the very end of the text.
+    """
+    start = loadcase_idx + NAME_OFFSET
+    if start >= len(text):
+        return None
+    if text[start] != "W":
+        # IDs are padded to four characters but may be longer (e.g. LL100)
+        match = LOAD_CASE_ID_PATTERN.match(text, start)
+        if match is not None and match.end() - start > 4:
+            return match.group()
+        return text[start:start + 4]
+    name = text[start:start + 32]
+    name = name.replace("    Name: ", "-")
+    name = name.replace("\n", "")
+    return name
+
+
+def _split_lines(block):
+    """Per-line fallback tokenizer for ragged tables"""
+    lines = [re.split(r'\s{2,}', line.strip()) for line in block.split('\n')]
+    return pd.DataFrame(lines)
+
+
+@functools.lru_cache(maxsize=None)
+def _direction_dtype(directions):
+    """Shared categorical dtype for a set of direction codes"""
+    return pd.CategoricalDtype(list(directions))
+
+
+def _typed_columns(block):
+    """
+    Tokenize a clean four-column table block into typed column arrays.
+    A trailing flag on a row (see TABLE_ROW_PATTERN) is dropped.
+    
+    Returns [line, bearing, direction, load] arrays, or None when the block
+    is not a clean table of numeric line/bearing/load fields.
+    """
+    rows = TABLE_ROW_PATTERN.findall(block)
+    if not rows or len(rows) != block.count('\n') + 1:
+        return None
+    lines, bearings, directions, loads = zip(*rows)
+    try:
+        line_ids = np.array(lines).astype(np.int32)
+        bearing_ids = np.array(bearings).astype(np.int32)
+        load_values = np.array(loads).astype(np.float64)
+    except (ValueError, OverflowError):
+        return None
+    codes_dirs, codes = np.unique(np.array(directions), return_inverse=True)
+    direction = pd.Categorical.from_codes(codes, dtype=_direction_dtype(tuple(codes_dirs.tolist())))
+    return [line_ids, bearing_ids, direction, load_values]
+
+
+def _coerce_columns(columns):
+    """
+    Cast the [line, bearing, direction, load] columns of a table that did
+    not tokenize cleanly to the types of _typed_columns(), so every table
+    stacks into the same typed columns.
+    
+    Line#, Bearing# and Loads-Kips go through pd.to_numeric; text becomes
+    NaN, and the IDs stay int32 only when they are all whole numbers.
+    Directions become string categories.
+    """
+    line, bearing, direction, load = (pd.Series(column, copy=False) for column in columns)
+    int32 = np.iinfo(np.int32)
+    ids = []
+    for values in (line, bearing):
+        values = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        if (np.isfinite(values).all() and (values % 1 == 0).all()
+                and ((values >= int32.min) & (values <= int32.max)).all()):
+            values = values.astype(np.int32)
+        ids.append(values)
+    load_values = pd.to_numeric(load, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    codes_dirs, codes = np.unique(direction.astype(str).to_numpy(dtype=object).astype(str),
+                                  return_inverse=True)
+    direction = pd.Categorical.from_codes(codes, dtype=_direction_dtype(tuple(codes_dirs.tolist())))
+    return [ids[0], ids[1], direction, load_values]
+
+
+def _type_table(df):
+    """
+    Give the first four table columns their native types.
+    
+    Line# and Bearing# become int32, Direction a category and Loads-Kips
+    float64. A column that does not convert cleanly is left as text.
+    """
+    if df.shape[1] < 4:
+        return df
+    int32 = np.iinfo(np.int32)
+    for col in df.columns[:2]:
+        values = pd.to_numeric(df[col], errors='coerce')
+        if values.notna().all() and (values % 1 == 0).all() and values.between(int32.min, int32.max).all():
+            df[col] = values.astype('int32')
+    df[df.columns[2]] = df[df.columns[2]].astype('category')
+    loads = pd.to_numeric(df[df.columns[3]], errors='coerce')
+    if loads.notna().all():
+        df[df.columns[3]] = loads.astype('float64')
+    return df
+
+
+def convSPtoDF(x, y):
+    """
+    Convert load case to dataframe.
+    
+    The whole table block is tokenized by one regex pass and converted
+    column-wise with NumPy. Blocks that are not clean four-column tables
+    go through read_csv, and ragged ones fall back to splitting each line
+    on runs of two or more spaces.
+    
+    Args:
+        x: Table text between the separator line and the end of the table
+        y: Load case name
+    
+    Returns:
+        DataFrame: One row per table line with positional column labels.
+        Line# and Bearing# are int32, Direction categorical and
+        Loads-Kips float64.
+    """
+    block = x.strip()
+    if not block:
+        return pd.DataFrame()
+    
+    columns = _typed_columns(block)
+    if columns is not None:
+        return pd.DataFrame(dict(enumerate(columns)), copy=False)
+    
+    try:
+        df = pd.read_csv(io.StringIO(block), sep=r'\s+', header=None,
+                         engine='c', na_filter=False)
+    except pd.errors.ParserError:
+        df = _split_lines(block)
+    return _type_table(df)
+
+
+def index_load_cases(text, diagnostics=None):
+    """
+    Locate the bearing load table of every load case in a single pass.
+    
+    Args:
+        text: Decoded report text, already trimmed with trim_report()
+        diagnostics: Optional ParseDiagnostics counting the markers
+    
+    Returns:
+        list: (loadcase_idx, data_start, data_end) per load case. data_start
+        and data_end are NO_BEARING_TABLE when the case has no "Bearing
+        loads:" table and NO_SEPARATOR when it has no dashed separator line.
+    """
+    index = index_markers(text)
+    if diagnostics is not None:
+        diagnostics.add_markers(index)
+    loadcases = index["loadcase"]
+    bearings = index["bearing"]
+    autos = index["auto"]
+    
+    spans = []
+    b = 0
+    a = 0
+    for k, loadcase_idx in enumerate(loadcases):
+        case_end = loadcases[k + 1] if k + 1 < len(loadcases) else len(text)
+        
+        # First "Bearing loads:" header inside this load case
+        while b < len(bearings) and bearings[b] < loadcase_idx:
+            b += 1
+        if b == len(bearings) or bearings[b] >= case_end:
+            spans.append((loadcase_idx, NO_BEARING_TABLE, NO_BEARING_TABLE))
+            continue
+        
+        # Dashed separator line below the header
+        sep_idx = text.find(SEPARATOR_LINE, bearings[b], case_end)
+        if sep_idx == -1:
+            spans.append((loadcase_idx, NO_SEPARATOR, NO_SEPARATOR))
+            continue
+        
+        # Data starts on the line after the separator
+        newline_after_sep = text.find("\n", sep_idx, case_end)
+        if newline_after_sep == -1:
+            data_start = sep_idx + len(SEPARATOR_LINE)
+        else:
+            data_start = newline_after_sep + 1
+        
+        # Data ends at "Auto generation details" or at the next load case
+        while a < len(autos) and autos[a] < data_start:
+            a += 1
+        if a < len(autos) and autos[a] < case_end:
+            data_end = autos[a]
+        else:
+            data_end = case_end
+        
+        spans.append((loadcase_idx, data_start, data_end))
+    return spans
+
+
+def iter_load_case_blocks(text, diagnostics=None, base=0):
+    """
+    Yield (loadcase_idx, name, data) for every load case in the report.
+    
+    data is the raw table text between the separator line and the end of
+    the table, or None when the load case has no bearing load table.
+    Load cases whose name runs past the end of the text are skipped.
+    
+    Args:
+        text: Decoded report text, already trimmed with trim_report()
+        diagnostics: Optional ParseDiagnostics recording the markers and
+            the load cases without a table
+        base: Offset of text in the whole report, added to every offset
+    """
+    for loadcase_idx, data_start, data_end in index_load_cases(text, diagnostics):
+        name = extract_load_case_name(text, loadcase_idx)
+        if name is None:
+            if diagnostics is not None:
+                diagnostics.add("truncated_name", base + loadcase_idx, snippet=text[loadcase_idx:])
+            continue
+        if data_start < 0:
+            if diagnostics is not None:
+                kind = "missing_table" if data_start == NO_BEARING_TABLE else "missing_separator"
+                diagnostics.add(kind, base + loadcase_idx, name.strip(),
+                                snippet=text[loadcase_idx:loadcase_idx + SNIPPET_LENGTH])
+            yield base + loadcase_idx, name, None
+        else:
+            yield base + loadcase_idx, name, text[data_start:data_end]
+
+
+def table_from_block(data):
+    """
+    Parse a table block into a frame labelled with TABLE_COLUMNS.
+    
+    Columns beyond the fourth are dropped. Returns None when there is no
+    block or it has fewer than four columns.
+    """
+    if data is None:
+        return None
+    df = convSPtoDF(data, None)
+    if df.shape[1] < 4:
+        return None
+    if df.shape[1] > 4:
+        df = df.iloc[:, :4]
+    df.columns = TABLE_COLUMNS
+    return df
+
+
+def _sniff_encoding(data, sample_size=ENCODING_SAMPLE_SIZE):
+    """Run chardet on the first sample_size bytes only"""
+    return chardet.detect(data[:sample_size])['encoding'] or 'latin-1'
+
+
+# Byte order marks, UTF-32 first since its little endian mark starts
+# with the UTF-16 one
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+]
+
+
+def _bom_encoding(data):
+    """Encoding announced by the byte order mark of data, else None"""
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if data.startswith(bom):
+            return encoding
+    return None
+
+
+def _has_markers(text):
+    """Whether decoded text holds a load case, the check of a cached encoding"""
+    return LOADCASE_MARKER in text
+
+
+def detect_encoding(sample, sample_size=ENCODING_SAMPLE_SIZE, cache_key=None):
+    """
+    Detect the encoding of report bytes from a bounded sample.
+    
+    A byte order mark decides first. ASCII and strict UTF-8 are tried
+    next, unless the sample holds NUL bytes (UTF-16/32 without a mark);
+    an ASCII sample gives UTF-8, its superset, since the rest of the file
+    may hold UTF-8 characters. Otherwise the encoding cached for
+    cache_key is reused if the sample decoded with it shows a load case
+    marker (a single-byte codec decodes anything, so decoding alone
+    proves nothing), and only then is chardet run on the sample.
+    """
+    sample = sample[:sample_size]
+    bom = _bom_encoding(sample)
+    if bom is not None:
+        return bom
+    if b'\x00' not in sample:
+        if sample.isascii():
+            return 'utf-8'
+        try:
+            # A multi-byte character may be cut at the end of the sample
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+    cached = _encoding_cache.get(cache_key)
+    if cached is not None and _has_markers(sample.decode(cached, errors='ignore')):
+        return cached
+    encoding = _sniff_encoding(sample, sample_size)
+    if cache_key is not None:
+        _encoding_cache[cache_key] = encoding
+    return encoding
+
+
+def normalize_newlines(text):
+    """Normalize Windows and old Mac line endings to Unix"""
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def decode_report(data, encoding=None, cache_key=None, stats=None):
+    """
+    Decode report bytes and normalize line endings to Unix.
+    
+    Args:
+        data: Raw report bytes
+        encoding: Explicit encoding, skips detection when given
+        cache_key: Report source; the encoding detected for it is reused
+            for later reports of the same source
+        stats: Optional PipelineStats; chardet runs are timed as "detect"
+    
+    Returns:
+        tuple: (text, encoding)
+    """
+    text = None
+    if encoding is None:
+        encoding = _bom_encoding(data)
+    if encoding is not None:
+        text = data.decode(encoding)
+    elif b'\x00' in data:
+        # UTF-16/32 without a byte order mark; ASCII and UTF-8 would decode it
+        pass
+    elif data.isascii():
+        encoding = 'ascii'
+        text = data.decode(encoding)
+    else:
+        try:
+            encoding = 'utf-8'
+            text = data.decode(encoding)
+        except UnicodeDecodeError:
+            pass
+    
+    # Reuse the encoding detected earlier for this source, unless it fails
+    # or finds no load case (a single-byte codec decodes any bytes)
+    if text is None and cache_key in _encoding_cache:
+        encoding = _encoding_cache[cache_key]
+        try:
+            text = data.decode(encoding)
+        except UnicodeDecodeError:
+            pass
+        if text is None or not _has_markers(text):
+            text = None
+            del _encoding_cache[cache_key]
+    
+    if text is None:
+        with stats.stage("detect") if stats is not None else contextlib.nullcontext():
+            encoding = _sniff_encoding(data)
+        text = data.decode(encoding)
+        if cache_key is not None:
+            _encoding_cache[cache_key] = encoding
+    
+    return normalize_newlines(text), encoding
+
+
+def _source_key(file_path):
+    """
+    Encoding cache key of a report file: the folder it was written to, since
+    reports written by the same RCPier install share one encoding
+    """
+    return os.path.dirname(os.path.abspath(file_path))
+
+
+def detect_file_encoding(file_path, sample_size=ENCODING_SAMPLE_SIZE):
+    """Detect the encoding of a report file from its first sample_size bytes"""
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+    return detect_encoding(sample, sample_size, _source_key(file_path))
+
+
+class _TextChunks:
+    """
+    Decoded text of a report file, chunk by chunk, with Unix line endings.
+    
+    With redetect, bytes the encoding cannot decode (e.g. a latin-1 degree
+    sign far past the sample the encoding was detected from) switch the
+    rest of the file, once, to an encoding detected from those bytes on.
+    encoding is then the encoding of the rest.
+    
+    Args:
+        file_path: Path to the text file
+        encoding: Text encoding of the file
+        chunk_size: Number of bytes read per chunk
+        redetect: Re-detect the encoding on a decode error instead of raising
+    """
+    
+    def __init__(self, file_path, encoding, chunk_size=STREAM_CHUNK_SIZE, redetect=False):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.redetect = redetect
+    
+    def __iter__(self):
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        redetect = self.redetect
+        carry = ""
+        with open(self.file_path, 'rb') as f:
+            while True:
+                data = f.read(self.chunk_size)
+                final = not data
+                try:
+                    text = decoder.decode(data, final)
+                except UnicodeDecodeError as e:
+                    if not redetect:
+                        raise
+                    redetect = False
+                    # Keep what decoded, e.object holds the decoder's buffer too
+                    text = e.object[:e.start].decode(self.encoding)
+                    rest = e.object[e.start:]
+                    self.encoding = _sniff_encoding(rest)
+                    decoder = codecs.getincrementaldecoder(self.encoding)()
+                    text += decoder.decode(rest, final)
+                text = carry + text
+                # A "\r\n" may be split across two chunks
+                carry = ""
+                if text.endswith('\r') and not final:
+                    carry, text = '\r', text[:-1]
+                # An empty chunk marks the end of the file
+                if text or final:
+                    yield normalize_newlines(text)
+                if final:
+                    break
+
+
+def _stream_blocks(chunks, diagnostics=None):
+    """
+    Yield (loadcase_idx, name, data) blocks from a report read in chunks.
+    
+    A block is yielded as soon as the next "Loadcase ID:" marker shows that
+    it is complete. loadcase_idx is the character offset in the whole file.
+    
+    Args:
+        chunks: Iterable of decoded text chunks, e.g. _TextChunks
+        diagnostics: Optional ParseDiagnostics, see iter_load_case_blocks()
+    """
+    buffer = ""
+    consumed = 0
+    chunks = iter(chunks)
+    try:
+        while True:
+            chunk = next(chunks, "")
+            eof = not chunk
+            # Only the new text (and a marker split across chunks) needs scanning
+            scan_from = max(0, len(buffer) - len(END_OF_LOADS_MARKER))
+            buffer += chunk
+            
+            end = buffer.find(END_OF_LOADS_MARKER, scan_from)
+            if end != -1:
+                buffer = buffer[:end]
+                eof = True
+            
+            # Every load case before the last marker is complete
+            if eof:
+                complete = len(buffer)
+            else:
+                complete = buffer.rfind(LOADCASE_MARKER)
+            
+            if complete > 0:
+                yield from iter_load_case_blocks(buffer[:complete], diagnostics, consumed)
+                buffer = buffer[complete:]
+                consumed += complete
+            if eof:
+                break
+    finally:
+        # Stopping at "Selected load groups" leaves the file open otherwise
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def stream_load_cases(file_path, encoding=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream (name, table) records from a report without loading it whole.
+    
+    The file is read in chunks and a record is yielded as soon as the next
+    "Loadcase ID:" marker shows that its block is complete. Reading stops
+    at "Selected load groups", so the tail of the report is never loaded.
+    Peak memory is bounded by the largest single load case plus one chunk.
+    
+    Args:
+        file_path: Path to the text file
+        encoding: Text encoding, detected from the head of the file when None
+            (and again where the rest of the file does not decode)
+        chunk_size: Number of bytes read per chunk
+    
+    Yields:
+        tuple: (name, table) with the table labelled with TABLE_COLUMNS
+    """
+    chunks = _TextChunks(file_path, encoding or detect_file_encoding(file_path), chunk_size,
+                         redetect=encoding is None)
+    for _, name, data in _stream_blocks(chunks):
+        df = table_from_block(data)
+        if df is not None:
+            yield name, df
+
+
+def classify_load_case(name, classifier=None):
+    """
+    Load category (one of CATEGORIES) of a load case name.
+    
+    Uses the rules of classifier, a load_classification.LoadCaseClassifier,
+    or of default_classifier() when None.
+    """
+    classifier = classifier if classifier is not None else default_classifier()
+    return classifier.classify(name)
+
+
+def _labelled_block(name, columns):
+    """
+    Block of a load case: a name column holding None, then the four table
+    columns prefixed with the name. Built in one constructor call, which
+    is much cheaper than renaming and inserting into a table frame.
+    """
+    labels = [name] + [f"{name} - {col}" for col in TABLE_COLUMNS]
+    columns = [np.full(len(columns[0]), None, dtype=object)] + list(columns)
+    return pd.DataFrame(dict(zip(labels, columns)), copy=False)
+
+
+def _long_frame(names, columns, classifier=None):
+    """
+    Stack the table columns of many load cases into one tidy frame.
+    
+    Args:
+        names: Load case name per case
+        columns: [line, bearing, direction, load] arrays per case
+        classifier: LoadCaseClassifier routing the cases, the default when None
+    """
+    if not names:
+        return pd.DataFrame({
+            'load_case': pd.Categorical([]),
+            'category': pd.Categorical([], categories=CATEGORIES),
+            'line': np.array([], dtype=np.int32),
+            'bearing': np.array([], dtype=np.int32),
+            'direction': pd.Categorical([]),
+            'load_kips': np.array([], dtype=np.float64),
+        })
+    lengths = np.array([len(case[0]) for case in columns])
+    
+    # Names and categories are stored once, as categorical codes
+    case_codes = {}
+    codes = [case_codes.setdefault(name, len(case_codes)) for name in names]
+    # Each distinct name is classified once
+    category_codes = {name: CATEGORIES.index(classify_load_case(name, classifier)) for name in case_codes}
+    categories = [category_codes[name] for name in names]
+    
+    return pd.DataFrame({
+        'load_case': pd.Categorical.from_codes(np.repeat(codes, lengths), categories=list(case_codes)),
+        'category': pd.Categorical.from_codes(np.repeat(categories, lengths), categories=CATEGORIES),
+        'line': np.concatenate([np.asarray(case[0]) for case in columns]),
+        'bearing': np.concatenate([np.asarray(case[1]) for case in columns]),
+        'direction': union_categoricals([case[2] for case in columns]),
+        'load_kips': np.concatenate([np.asarray(case[3]) for case in columns]),
+    }, copy=False)
+
+
+class LoadCaseTable(Mapping):
+    """
+    Compact typed storage of the load cases of a report.
+    
+    Every table lives in one tidy frame with LONG_COLUMNS: int32 line and
+    bearing IDs, categorical direction codes, float64 loads, and each
+    load case name interned once in the categories of load_case. A large
+    report is thus a handful of arrays instead of thousands of small
+    DataFrames holding Python objects.
+    
+    As a mapping it is the df_dict of a parse: load case name -> its
+    block (name column + four table columns), built on access. A name
+    that appears twice maps to its last table, like assigning into a
+    dict; the category frames keep both.
+    
+    Args:
+        table: Tidy frame with LONG_COLUMNS, rows of a load case together
+        lengths: Row count of every load case table in table order. When
+            None, a table ends where the load case name changes, which
+            merges adjacent tables of the same name
+    """
+    
+    def __init__(self, table, lengths=None):
+        self.table = table
+        codes = table['load_case'].cat.codes.to_numpy().astype(np.int64)
+        if lengths is None:
+            starts = np.flatnonzero(np.diff(codes, prepend=-1))
+            lengths = np.diff(np.append(starts, len(codes)))
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        stops = np.cumsum(self.lengths)
+        starts = stops - self.lengths
+        names = table['load_case'].cat.categories
+        categories = table['category'].cat.codes.to_numpy()[starts]
+        # (name, category, first row, end row) of every load case, in report order
+        self.cases = [(names[code], CATEGORIES[category], start, stop)
+                      for code, category, start, stop in zip(codes[starts], categories, starts, stops)]
+        self._rows = {name: (start, stop) for name, _, start, stop in self.cases}
+        self._columns = [table['line'].to_numpy(), table['bearing'].to_numpy(),
+                         table['direction'].array, table['load_kips'].to_numpy()]
+    
+    def __reduce__(self):
+        # Pickle (cache, worker results) only the compact table
+        return (LoadCaseTable, (self.table, self.lengths))
+    
+    def __getitem__(self, name):
+        return self._block(name, *self._rows[name])
+    
+    def __iter__(self):
+        return iter(self._rows)
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def _block(self, name, start, stop):
+        return _labelled_block(name, [column[start:stop] for column in self._columns])
+    
+    def case_counts(self):
+        """Number of load case tables per category"""
+        counts = dict.fromkeys(CATEGORIES, 0)
+        for _, category, _, _ in self.cases:
+            counts[category] += 1
+        return counts
+    
+    def names(self, category=None):
+        """Load case names of a category (all when None), in report order"""
+        return list(dict.fromkeys(name for name, case_category, _, _ in self.cases
+                                  if category is None or case_category == category))
+    
+    def summary(self):
+        """
+        Per load case statistics of the loads.
+        
+        Returns:
+            DataFrame: load_case, category, rows, min_kips, max_kips and
+            sum_kips, one row per load case name in report order
+        """
+        table = self.table
+        loads = pd.to_numeric(table['load_kips'], errors='coerce')
+        groups = loads.groupby(table['load_case'], observed=True, sort=False)
+        summary = pd.DataFrame({
+            'rows': groups.size(),
+            'min_kips': groups.min(),
+            'max_kips': groups.max(),
+            'sum_kips': groups.sum(),
+        })
+        summary.insert(0, 'category', table['category'].groupby(
+            table['load_case'], observed=True, sort=False).first())
+        return summary.rename_axis('load_case').reset_index()
+    
+    def frame(self, category):
+        """Side-by-side frame of the load case blocks of one category"""
+        blocks = [self._block(name, start, stop)
+                  for name, case_category, start, stop in self.cases if case_category == category]
+        if not blocks:
+            return pd.DataFrame()
+        return pd.concat(blocks, axis=1)
+    
+    def frames(self):
+        """Every category frame, keyed by category"""
+        return {category: self.frame(category) for category in CATEGORIES}
+
+
+@dataclass
+class ParseResult:
+    """
+    Outcome of parse_report().
+    
+    Attributes:
+        df_dict: LoadCaseTable, mapping load case name -> its block (name
+            column + four table columns)
+        encoding: Encoding the report was decoded with
+        counters: Processed and skipped load case counts
+        first_loadcase_index: Offset of the first "Loadcase ID:" marker, -1 if none
+        sample_data: Table text of the first load case, for debugging
+        sample_shape: Shape of the first parsed table, for debugging
+        long: Tidy frame with LONG_COLUMNS (the storage of df_dict)
+        stats: PipelineStats of the parse
+        diagnostics: ParseDiagnostics with the markers seen and the issues
+            met, with offsets and snippets
+    """
+    df_dict: LoadCaseTable = None
+    encoding: str = None
+    counters: dict = field(default_factory=lambda: dict.fromkeys(
+        ["iterations", "processed", "skipped_pattern_not_found", "skipped_empty_data",
+         "skipped_wrong_columns", "skipped_empty_dataframe"], 0))
+    first_loadcase_index: int = -1
+    sample_data: str = None
+    sample_shape: tuple = None
+    long: pd.DataFrame = None
+    stats: PipelineStats = None
+    diagnostics: ParseDiagnostics = None
+    
+    @property
+    def frames(self):
+        """Category -> side-by-side frame of its load case blocks, built on each access"""
+        return self.df_dict.frames()
+
+
+def to_long(df_dict, classifier=None):
+    """
+    Tidy LONG_COLUMNS frame of wide load case blocks.
+    
+    A LoadCaseTable returns its table as is; a plain dict of blocks (e.g.
+    built by hand) is stacked, classified by classifier (the default when
+    None).
+    """
+    if isinstance(df_dict, LoadCaseTable):
+        return df_dict.table
+    # items() is the cheapest public way to reach the column arrays
+    columns = [_coerce_columns([column.array for _, column in itertools.islice(block.items(), 1, 5)])
+               for block in df_dict.values()]
+    return _long_frame(list(df_dict), columns, classifier)
+
+
+def parse_blocks(blocks, report_size=None, progress=None, stats=None, classifier=None,
+                 diagnostics=None):
+    """
+    Turn (loadcase_idx, name, data) blocks into a ParseResult.
+    
+    The typed columns of every table are collected and stacked into one
+    LoadCaseTable at the end. Its blocks are a name column (holding None)
+    followed by the four table columns prefixed with the load case name,
+    so column labels stay unique across a category frame.
+    
+    Args:
+        blocks: Iterable of (loadcase_idx, name, data), see iter_load_case_blocks()
+        report_size: Length of the report, used to compute progress
+        progress: Optional callable(fraction, load_cases_seen)
+        stats: PipelineStats to record into; producing the blocks is timed
+            as "scan", typing the tables as "convert" and stacking them as
+            "assemble"
+        classifier: load_classification.LoadCaseClassifier routing the load
+            cases to categories, default_classifier() when None
+        diagnostics: ParseDiagnostics the blocks record their markers into
+            (pass the same one to iter_load_case_blocks()); the table issues
+            are added here. A new one when None
+    """
+    stats = stats if stats is not None else PipelineStats()
+    diagnostics = diagnostics if diagnostics is not None else ParseDiagnostics()
+    result = ParseResult(stats=stats, diagnostics=diagnostics)
+    counters = result.counters
+    names = []
+    case_columns = []
+    
+    for i, (loadcase_idx, name, data) in enumerate(stats.timed(blocks, "scan"), 1):
+        counters["iterations"] = i
+        if i == 1:
+            result.first_loadcase_index = loadcase_idx
+        if progress is not None and report_size:
+            progress(min(loadcase_idx / report_size, 1.0), i)
+        # Normalize whitespace in name to avoid trailing spaces
+        name = name.strip()
+        
+        # No 'Bearing loads:' table or dashed separator in this load case
+        if data is None:
+            counters["skipped_pattern_not_found"] += 1
+            continue
+        if i == 1:
+            result.sample_data = data[:500]
+        block = data.strip()
+        if not block:
+            counters["skipped_empty_data"] += 1
+            diagnostics.add("empty_table", loadcase_idx, name)
+            continue
+        
+        with stats.stage("convert"):
+            # Clean tables skip the intermediate frame of convSPtoDF()
+            columns = _typed_columns(block)
+            if columns is None:
+                df = convSPtoDF(data, name)
+                if i == 1:
+                    result.sample_shape = df.shape
+                
+                # Keep only the first 4 columns
+                if df.shape[1] < 4:
+                    counters["skipped_wrong_columns"] += 1
+                    diagnostics.add("wrong_columns", loadcase_idx, name, snippet=block,
+                                    detail=f"{df.shape[1]} columns")
+                    continue
+                # A fifth column is the expected flag of live load rows;
+                # short rows leave empty (read_csv) or missing cells
+                cells = df.iloc[:, :4].astype(object)
+                if df.shape[1] > 5 or (cells.isna() | (cells == '')).any(axis=None):
+                    diagnostics.add("irregular_table", loadcase_idx, name, snippet=block,
+                                    detail=f"{df.shape[1]} columns")
+                if not all(pd.api.types.is_numeric_dtype(df.iloc[:, k]) for k in (0, 1, 3)):
+                    diagnostics.add("text_columns", loadcase_idx, name, snippet=block)
+                columns = _coerce_columns([df.iloc[:, k] for k in range(4)])
+            elif i == 1:
+                result.sample_shape = (len(columns[0]), 4)
+            if len(columns[0]) == 0:
+                counters["skipped_empty_dataframe"] += 1
+                diagnostics.add("empty_dataframe", loadcase_idx, name, snippet=block)
+                continue
+        
+        counters["processed"] += 1
+        names.append(name)
+        case_columns.append(columns)
+        stats.rows += len(columns[0])
+    
+    if not counters["iterations"]:
+        diagnostics.add("no_load_cases", 0)
+    
+    # Stack every table into the compact storage once
+    with stats.stage("assemble"):
+        result.long = _long_frame(names, case_columns, classifier)
+        result.df_dict = LoadCaseTable(result.long, [len(columns[0]) for columns in case_columns])
+    stats.load_cases = counters["processed"]
+    stats.counters = counters
+    diagnostics.counters = counters
+    return result
+
+
+def parse_report(source, encoding=None, stream=False, progress=None, errors="strict",
+                 cache_key=None, stats=None, classifier=None, diagnostics=None):
+    """
+    Parse an RCPier report; the shared entry point of the CLI and the app.
+    
+    Args:
+        source: Path of the report file, or its raw bytes
+        encoding: Text encoding, detected when None
+        stream: Read a report file chunk by chunk to bound memory use
+        progress: Optional callable(fraction, load_cases_seen)
+        errors: "strict" raises on undecodable input; another codec error
+            handler (e.g. "ignore") decodes it as UTF-8 with that handler
+        cache_key: Encoding cache key for raw bytes (files use their folder)
+        stats: PipelineStats to record the stage timings into, so callers
+            can add their own stages (e.g. export); a new one when None
+        classifier: LoadCaseClassifier routing the load cases, see parse_blocks()
+        diagnostics: ParseDiagnostics to record into; a new one when None
+    
+    Returns:
+        ParseResult, with the timings in its stats and the issues in its
+        diagnostics
+    """
+    stats = stats if stats is not None else PipelineStats()
+    diagnostics = diagnostics if diagnostics is not None else ParseDiagnostics()
+    
+    if stream:
+        stats.bytes = os.path.getsize(source)
+        detected = encoding is None
+        if detected:
+            with stats.stage("detect"):
+                encoding = detect_file_encoding(source)
+        # Reading and decoding the chunks is part of the "scan" stage; a
+        # detected encoding is detected again where the rest does not decode
+        chunks = _TextChunks(source, encoding, redetect=detected)
+        blocks = _stream_blocks(chunks, diagnostics)
+        result = parse_blocks(blocks, stats.bytes, progress, stats, classifier, diagnostics)
+        result.encoding = chunks.encoding
+        return result
+    
+    with stats.stage("read"):
+        if isinstance(source, (bytes, bytearray)):
+            data = source
+        else:
+            with open(source, 'rb') as f:
+                data = f.read()
+            cache_key = _source_key(source)
+    stats.bytes = len(data)
+    
+    with stats.stage("decode"):
+        try:
+            text, encoding = decode_report(data, encoding, cache_key, stats)
+        except (UnicodeDecodeError, LookupError):
+            if errors == "strict":
+                raise
+            text = normalize_newlines(data.decode('utf-8', errors=errors))
+            encoding = 'utf-8'
+    del data
+    
+    # Remove everything after "Selected load groups"
+    with stats.stage("scan"):
+        text = trim_report(text)
+    blocks = iter_load_case_blocks(text, diagnostics)
+    result = parse_blocks(blocks, len(text), progress, stats, classifier, diagnostics)
+    result.encoding = encoding
+    return result
@@ -0,0 +1,127 @@
+"""
+On-disk cache of parsed RCPier reports.
+
+Entries are keyed by a hash of the raw report bytes, so an unchanged
+report is loaded back without decoding or parsing it again. Entries are
+pickles of the parse results and the cache is trimmed to a size limit by
+evicting the least recently used entries.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+
+# Bump when the cached result layout changes, to invalidate old entries
+CACHE_VERSION = 5
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "RCPIER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "rcpier"))
+
+# Total size of the cache directory before LRU eviction kicks in
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(file_path):
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of parse results on disk.
+    
+    Args:
+        cache_dir: Folder holding the cache entries
+        max_bytes: Size limit of all entries together
+    """
+    
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def key(self, file_path, *options):
+        """
+        Cache key of a report file.
+        
+        options are parse settings that change the result (e.g. an
+        explicit encoding); they become part of the key.
+        """
+        parts = [str(CACHE_VERSION), file_digest(file_path)] + [str(option) for option in options]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".pkl")
+    
+    def get(self, key):
+        """
+        Return the cached result for key, or None on a miss.
+        
+        An entry that cannot be loaded (truncated, corrupted, or pickled
+        by an incompatible version of a library) is deleted and counts as
+        a miss.
+        """
+        path = self._path(key)
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+        try:
+            with f:
+                result = pickle.load(f)
+        except Exception:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+    
+    def put(self, key, result):
+        """Store a result under key and evict old entries if over the limit"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # Atomic, so concurrent batch workers never read a partial entry
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".pkl"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
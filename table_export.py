@@ -0,0 +1,56 @@
+"""
+Columnar exports of the long (tidy) load table.
+
+Parquet and Feather keep the column types (categorical load case,
+category and direction, integer IDs, float loads) and load back in
+milliseconds; CSV is the plain-text fallback. Parquet and Feather need
+pyarrow.
+"""
+
+
+# Formats of write_table(), which are also the file extensions
+TABLE_FORMATS = ("parquet", "feather", "csv")
+
+# Columns that must be numeric for the columnar formats
+NUMERIC_COLUMNS = ("line", "bearing", "load_kips")
+
+
+def _numeric_columns(df):
+    """
+    Convert text (object or string) numeric columns to numbers, NaN where a
+    value is not one. pyarrow cannot write a column mixing numbers and text.
+    """
+    import pandas as pd
+    
+    text = [col for col in NUMERIC_COLUMNS
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col])]
+    if not text:
+        return df
+    return df.assign(**{col: pd.to_numeric(df[col], errors='coerce') for col in text})
+
+
+def write_table(target, df, fmt):
+    """
+    Write a long load table in a columnar or text format.
+    
+    Args:
+        target: Output path or binary file object (e.g. BytesIO)
+        df: Frame with rcpier_parser.LONG_COLUMNS
+        fmt: One of TABLE_FORMATS
+    """
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"Unknown table format '{fmt}', expected one of {TABLE_FORMATS}")
+    if df.empty:
+        raise ValueError("No data to write: the load table is empty")
+    df = df.reset_index(drop=True)
+    if fmt == "csv":
+        df.to_csv(target, index=False)
+        return
+    df = _numeric_columns(df)
+    try:
+        if fmt == "parquet":
+            df.to_parquet(target, index=False)
+        else:
+            df.to_feather(target)
+    except ImportError as e:
+        raise ImportError(f"{fmt} export needs pyarrow (pip install pyarrow): {e}") from e
@@ -0,0 +1,313 @@
+"""
+Background conversion jobs for the Streamlit app.
+
+Uploads are parsed and turned into a workbook in a local process pool
+instead of the Streamlit script thread, so several engineers converting
+large reports do not block each other and a browser refresh does not
+lose the work. Jobs are keyed by the hash of the upload and the
+encoding, so an identical upload reuses the running or finished job.
+Workers report the parse progress of their job through a
+multiprocessing manager, which the app polls. No external services are
+needed.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from excel_export import write_workbook
+from rcpier_parser import BLOCK_WIDTH, parse_report
+
+
+# Worker processes; conversions are CPU bound, so one per core lets a
+# multi-pier upload finish in about the time of its largest report
+DEFAULT_WORKERS = int(os.environ.get("RCPIER_JOB_WORKERS", os.cpu_count() or 1))
+
+# Finished jobs kept for reuse and re-download, besides the jobs held by
+# a session (which are never dropped, however many reports it uploads)
+DEFAULT_MAX_JOBS = 32
+
+# Seconds a session's hold on its jobs lasts unless renewed; a session
+# renews it on every rerun, so this only ends the holds of closed tabs
+HOLD_SECONDS = 3600
+
+# Minimum seconds between two progress reports of a worker
+PROGRESS_INTERVAL = 0.1
+
+
+def job_key(file_bytes, *options):
+    """Job ID of an upload: identical bytes and options give the same job"""
+    digest = hashlib.sha256(file_bytes)
+    for option in options:
+        digest.update(b"|" + str(option).encode())
+    return digest.hexdigest()
+
+
+class ProgressReporter:
+    """
+    parse_report() progress callback storing the progress of a job in a
+    shared (manager) dict, at most every PROGRESS_INTERVAL seconds. The
+    end of the parse (fraction 1.0) is always stored.
+    
+    Args:
+        store: Dict proxy shared with the app, job ID -> (fraction, load cases)
+        job_id: Key of the job in store
+    """
+    
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+        self.last_report = 0.0
+    
+    def __call__(self, fraction, load_cases):
+        now = time.monotonic()
+        if fraction >= 1.0 or now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            self.store[self.job_id] = (fraction, load_cases)
+
+
+def convert_upload(file_bytes, encoding_choice, progress=None):
+    """
+    Parse an uploaded report and build its workbook; runs in a worker.
+    
+    Args:
+        file_bytes: Uploaded report
+        encoding_choice: Encoding name, or "Auto-detect"
+        progress: Optional callable(fraction, load_cases_seen) following
+            the parse
+    
+    Returns:
+        dict: df_dict (a compact LoadCaseTable), debug counters, diagnostics
+        (a ParseDiagnostics), stats, workbook bytes (None without data) and
+        export_seconds
+    """
+    selected_encoding = None if encoding_choice == "Auto-detect" else encoding_choice
+    # Undecodable bytes fall back to utf-8 with errors ignored. Uploads come
+    # from any user and machine, so no detected encoding is cached for the
+    # next one; detection only samples the start of the report anyway
+    result = parse_report(file_bytes, selected_encoding, progress=progress, errors='ignore')
+    
+    if progress is not None:
+        # Parsed; the workbook export follows
+        progress(1.0, result.counters["iterations"])
+    counters = result.counters
+    debug = {
+        "iterations": counters["iterations"],
+        "processed_count": counters["processed"],
+        "skipped_pattern_not_found": counters["skipped_pattern_not_found"],
+        "skipped_empty_data": counters["skipped_empty_data"],
+        "skipped_wrong_columns": counters["skipped_wrong_columns"],
+        "skipped_empty_dataframe": counters["skipped_empty_dataframe"],
+        "sample_extracted_data": result.sample_data,
+        "sample_df_shape": result.sample_shape,
+        "initial_loadnameindex": result.first_loadcase_index,
+    }
+    
+    workbook = None
+    export_seconds = None
+    if len(result.df_dict):
+        start = time.perf_counter()
+        output = BytesIO()
+        write_workbook(output, result.frames, column_group=BLOCK_WIDTH)
+        workbook = output.getvalue()
+        export_seconds = time.perf_counter() - start
+    
+    return {
+        "df_dict": result.df_dict,
+        "debug": debug,
+        "diagnostics": result.diagnostics,
+        "stats": result.stats,
+        "workbook": workbook,
+        "export_seconds": export_seconds,
+    }
+
+
+class Job:
+    """One submitted upload and the future of its conversion"""
+    
+    def __init__(self, job_id, name, size, future, progress_store=None):
+        self.job_id = job_id
+        self.name = name
+        self.size = size
+        self.future = future
+        self.progress_store = progress_store
+        self.submitted = time.time()
+        self.finished = None
+    
+    @property
+    def status(self):
+        """One of "queued", "running", "done" or "failed" """
+        if self.future.done():
+            if self.future.cancelled() or self.future.exception() is not None:
+                return "failed"
+            return "done"
+        if self.future.running():
+            return "running"
+        return "queued"
+    
+    @property
+    def error(self):
+        """Error message of a failed job, else None"""
+        if not self.future.done():
+            return None
+        if self.future.cancelled():
+            return "Cancelled"
+        exc = self.future.exception()
+        return None if exc is None else f"{type(exc).__name__}: {exc}"
+    
+    @property
+    def progress(self):
+        """
+        (fraction, load cases seen) of the parse as last reported by the
+        worker; (0.0, 0) before its first report, (1.0, None) once done
+        """
+        if self.future.done():
+            return 1.0, None
+        if self.progress_store is None:
+            return 0.0, 0
+        try:
+            return self.progress_store.get(self.job_id, (0.0, 0))
+        except (OSError, EOFError):  # Manager process gone (shutdown)
+            return 0.0, 0
+    
+    @property
+    def elapsed(self):
+        """Seconds from submission to completion (or until now)"""
+        return (self.finished or time.time()) - self.submitted
+    
+    def result(self):
+        """Conversion result; only valid once the job is done"""
+        return self.future.result()
+
+
+class JobManager:
+    """
+    Process pool running conversion jobs, with the jobs stored by ID.
+    
+    Safe to share between Streamlit sessions (threads). Failed jobs are
+    resubmitted by the next identical upload. A session holds the jobs it
+    uses (see hold()), which are kept; besides those, at most max_jobs
+    finished jobs are kept, the oldest are dropped first.
+    
+    Args:
+        workers: Number of worker processes
+        max_jobs: Finished jobs kept for reuse besides the held ones
+        task: Function run for each job, called as
+            task(file_bytes, *options, progress=callable(fraction, load_cases))
+    """
+    
+    def __init__(self, workers=DEFAULT_WORKERS, max_jobs=DEFAULT_MAX_JOBS, task=convert_upload):
+        self.workers = workers
+        self.executor = self._new_executor()
+        # Progress of the running jobs, written by the workers; the manager
+        # process is started by the first submit, not while a spawned
+        # worker re-imports the app
+        self.sync = None
+        self.progress = None
+        self.max_jobs = max_jobs
+        self.task = task
+        self.jobs = {}
+        # owner -> (held job IDs, time.monotonic() of the last renewal)
+        self.holds = {}
+        self.lock = threading.Lock()
+    
+    def _new_executor(self):
+        # spawn: forking a multi-threaded server process is not safe
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+    
+    def _finished(self, job):
+        job.finished = time.time()
+        try:
+            self.progress.pop(job.job_id, None)
+        except (OSError, EOFError):
+            pass
+    
+    def hold(self, owner, job_ids):
+        """
+        Keep job_ids (and drop the rest of owner's previous hold) until
+        the hold is renewed or HOLD_SECONDS have passed.
+        
+        Args:
+            owner: Holder of the jobs, e.g. a Streamlit session ID
+            job_ids: Jobs the owner shows or will ask for
+        """
+        with self.lock:
+            self.holds[owner] = (set(job_ids), time.monotonic())
+    
+    def submit(self, file_bytes, *options, name=None, owner=None):
+        """
+        Queue a conversion, or return the existing job of an identical upload.
+        
+        Args:
+            owner: Holder the job is added to (see hold()), so it is not
+                dropped by the submits that follow
+        
+        Returns:
+            str: Job ID
+        """
+        job_id = job_key(file_bytes, *options)
+        with self.lock:
+            if owner is not None:
+                held, _ = self.holds.get(owner, (set(), None))
+                self.holds[owner] = (held | {job_id}, time.monotonic())
+            job = self.jobs.get(job_id)
+            if job is not None and job.status != "failed":
+                return job_id
+            if self.sync is None:
+                self.sync = multiprocessing.get_context("spawn").Manager()
+                self.progress = self.sync.dict()
+            progress = ProgressReporter(self.progress, job_id)
+            try:
+                future = self.executor.submit(self.task, file_bytes, *options, progress=progress)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start a fresh pool
+                self.executor = self._new_executor()
+                future = self.executor.submit(self.task, file_bytes, *options, progress=progress)
+            job = Job(job_id, name, len(file_bytes), future, self.progress)
+            future.add_done_callback(lambda _, job=job: self._finished(job))
+            self.jobs[job_id] = job
+            self._trim()
+        return job_id
+    
+    def get(self, job_id):
+        """Job with this ID, or None if unknown or dropped"""
+        with self.lock:
+            return self.jobs.get(job_id)
+    
+    def list(self):
+        """All jobs, most recent first"""
+        with self.lock:
+            return sorted(self.jobs.values(), key=lambda job: job.submitted, reverse=True)
+    
+    def wait(self, job_id, timeout=None):
+        """Block until a job is finished and return it"""
+        job = self.get(job_id)
+        if job is not None:
+            try:
+                job.future.exception(timeout=timeout)
+            except Exception:
+                pass
+        return job
+    
+    def _trim(self):
+        now = time.monotonic()
+        for owner, (_, renewed) in list(self.holds.items()):
+            if now - renewed > HOLD_SECONDS:
+                del self.holds[owner]
+        held = set().union(*(job_ids for job_ids, _ in self.holds.values()))
+        finished = [job for job in self.jobs.values() if job.future.done() and job.job_id not in held]
+        excess = len(finished) - self.max_jobs
+        for job in sorted(finished, key=lambda job: job.submitted)[:max(excess, 0)]:
+            del self.jobs[job.job_id]
+    
+    def shutdown(self):
+        """Stop the worker processes, cancelling queued jobs"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.sync is not None:
+            self.sync.shutdown()
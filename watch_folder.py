@@ -0,0 +1,208 @@
+"""
+Watch a folder and convert RCPier reports as they are written.
+
+The folder is polled for .txt reports. A new or modified report is only
+converted once its size and modification time have stayed the same for
+a settle time, so a report RCPier is still writing is never read half
+done. A report whose content hash matches the version converted last
+(e.g. saved again without changes) is skipped.
+
+The conversions run in a process pool that lives as long as the
+watcher. Its workers are started and warmed up before the first report
+arrives, so a conversion only pays for the parse and the export, not
+for starting Python and importing pandas.
+"""
+
+import glob
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from excel_export import resolve_engine
+from extract_loads_rcpier import convert_file, output_path, print_result
+from result_cache import file_digest
+
+
+# Seconds between two scans of the folder
+POLL_INTERVAL = 0.25
+
+# Seconds a report must stay unchanged before it is converted
+SETTLE_SECONDS = 0.5
+
+# convert_file() results kept for the return value of watch(); the
+# watcher runs indefinitely, and every result is printed when it arrives
+KEPT_RESULTS = 100
+
+
+def warm_up(engine="auto", fmt="xlsx"):
+    """
+    Prepare a fresh worker process: import the parser (and with it pandas
+    and numpy) and the writer of the output format.
+    
+    Ctrl+C is left to the watcher, which lets the running conversions
+    finish before it stops.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import rcpier_parser  # noqa: F401
+    if fmt == "xlsx":
+        if resolve_engine(engine) == "xlsxwriter":
+            import xlsxwriter  # noqa: F401
+        else:
+            import openpyxl  # noqa: F401
+    elif fmt in ("parquet", "feather"):
+        import pyarrow  # noqa: F401
+
+
+def _started():
+    """No-op task, submitted to start the workers before any report arrives"""
+    return os.getpid()
+
+
+class FolderWatcher:
+    """
+    Track the reports of a folder and tell which are ready to convert.
+    
+    Args:
+        folder: Folder to watch
+        pattern: Glob pattern of the reports inside folder
+        settle: Seconds the size and modification time of a report must
+            stay unchanged before it is considered completely written
+    """
+    
+    def __init__(self, folder, pattern="*.txt", settle=SETTLE_SECONDS):
+        self.folder = folder
+        self.pattern = pattern
+        self.settle = settle
+        # path -> [(size, mtime_ns), time first seen, handled]
+        self.seen = {}
+        # path -> content digest of the last converted version
+        self.converted = {}
+    
+    def scan(self):
+        """(size, mtime_ns) of every report in the folder"""
+        signatures = {}
+        for path in glob.glob(os.path.join(self.folder, self.pattern)):
+            try:
+                st = os.stat(path)
+            except OSError:  # Removed since the listing
+                continue
+            signatures[path] = (st.st_size, st.st_mtime_ns)
+        return signatures
+    
+    def mark_converted(self, path, digest=None, signature=None):
+        """
+        Remember the content a report was converted from.
+        
+        With the report's (size, mtime_ns) signature, it also counts as
+        handled until it changes, so it is not even hashed again.
+        """
+        self.converted[path] = digest if digest is not None else file_digest(path)
+        if signature is not None:
+            self.seen[path] = [signature, time.monotonic(), True]
+    
+    def poll(self, busy=(), now=None):
+        """
+        Reports that have settled since they last changed.
+        
+        Args:
+            busy: Reports being converted; they are reported again once
+                they are done if they changed in the meantime
+            now: time.monotonic() of this poll
+        
+        Returns:
+            list: (path, digest) of each report to convert, in name order
+        """
+        now = time.monotonic() if now is None else now
+        signatures = self.scan()
+        for path in list(self.seen):
+            if path not in signatures:
+                del self.seen[path]
+                self.converted.pop(path, None)
+        
+        ready = []
+        for path, signature in sorted(signatures.items()):
+            state = self.seen.get(path)
+            if state is None or state[0] != signature:
+                self.seen[path] = [signature, now, False]
+                continue
+            # Still being written, already handled, empty or in a worker
+            if state[2] or now - state[1] < self.settle or signature[0] == 0 or path in busy:
+                continue
+            state[2] = True
+            try:
+                digest = file_digest(path)
+            except OSError:
+                continue
+            if self.converted.get(path) == digest:
+                print(f"[same]   {path}: content unchanged, skipped")
+                continue
+            ready.append((path, digest))
+        return ready
+
+
+def watch(folder, workers=None, poll_interval=POLL_INTERVAL, settle=SETTLE_SECONDS, output_dir=None,
+          stream=False, encoding=None, engine="auto", cache_dir=None, fmt="xlsx", combinations=False,
+          classifier=None, write_diagnostics=False):
+    """
+    Convert the reports of a folder as they are written, until interrupted.
+    
+    Reports whose output is already newer than them are taken as
+    converted when the watcher starts; every other report is converted
+    once it has settled. The conversion options are those of
+    extract_loads_rcpier.run_batch().
+    
+    Args:
+        folder: Folder to watch
+        workers: Number of worker processes (defaults to the CPU count)
+        poll_interval: Seconds between two scans of the folder
+        settle: Seconds a report must stay unchanged before it is converted
+    
+    Returns:
+        list: The last KEPT_RESULTS convert_file() results, in completion order
+    """
+    if not os.path.isdir(folder):
+        raise ValueError(f"Not a folder: '{folder}'")
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    
+    watcher = FolderWatcher(folder, settle=settle)
+    for path, signature in watcher.scan().items():
+        output = output_path(path, fmt, output_dir)
+        if os.path.exists(output) and os.path.getmtime(output) >= os.path.getmtime(path):
+            watcher.mark_converted(path, signature=signature)
+    
+    results = deque(maxlen=KEPT_RESULTS)
+    # path -> (future, digest) of the conversions in progress
+    running = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up, initargs=(engine, fmt)) as executor:
+        # Start the workers now rather than when the first report arrives
+        for future in [executor.submit(_started) for _ in range(workers)]:
+            future.result()
+        print(f"Watching {folder} with {workers} workers ({len(watcher.converted)} reports up to date), "
+              f"press Ctrl+C to stop")
+        
+        try:
+            while True:
+                for path, (future, digest) in list(running.items()):
+                    if not future.done():
+                        continue
+                    del running[path]
+                    result = future.result()
+                    results.append(result)
+                    print_result(result)
+                    if result["error"] is None:
+                        watcher.mark_converted(path, digest)
+                
+                for path, digest in watcher.poll(busy=running):
+                    future = executor.submit(convert_file, path, output_dir, stream, encoding, engine,
+                                             cache_dir, False, fmt, combinations, False, classifier,
+                                             write_diagnostics)
+                    running[path] = (future, digest)
+                
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            print(f"\nStopped watching {folder}, {len(running)} conversions left to finish")
+    return list(results)